@@ -0,0 +1,84 @@
+import threading
+import time
+
+# Runs asset-baking tasks on a worker thread and reports how far along they
+# are, so a loading screen can keep drawing while the work happens. Tasks
+# must only draw to their own surfaces - fonts and the display stay on the
+# main thread
+class AssetPreloader:
+    def __init__(self):
+        self.tasks = []    # (name, func, weight) in run order
+        self.results = {}  # Task name -> return value
+        self.error = None
+        self.current = None  # Name of the running task
+        self.completed_weight = 0.0
+        self.total_weight = 0.0
+        self.elapsed = 0.0
+        self.thread = None
+        self.cancelled = threading.Event()
+    
+    def add(self, name, func, weight=1.0):
+        """
+        Queue a task
+        
+        Args:
+            name: Name the result is stored under (also shown while it runs)
+            func: Function to call with no arguments
+            weight: Share of the progress bar, roughly the task's cost
+        """
+        if self.thread is not None:
+            raise RuntimeError("Tasks can't be added once the preloader has started")
+        self.tasks.append((name, func, weight))
+        self.total_weight += weight
+    
+    def start(self):
+        """Start running the tasks on a worker thread"""
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run, name="AssetPreloader", daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        start = time.perf_counter()
+        try:
+            for name, func, weight in self.tasks:
+                if self.cancelled.is_set():
+                    break
+                self.current = name
+                self.results[name] = func()
+                self.completed_weight += weight
+        except Exception as e:
+            self.error = e
+        finally:
+            self.current = None
+            self.elapsed = time.perf_counter() - start
+    
+    @property
+    def progress(self):
+        """Fraction of the work done (0 to 1)"""
+        if self.total_weight <= 0:
+            return 1.0 if self.done else 0.0
+        return min(1.0, self.completed_weight / self.total_weight)
+    
+    @property
+    def done(self):
+        """Whether the worker has finished, failed or been cancelled"""
+        return self.thread is not None and not self.thread.is_alive()
+    
+    def cancel(self):
+        """Skip the tasks that haven't started yet and wait for the running one"""
+        self.cancelled.set()
+        if self.thread is not None:
+            self.thread.join()
+    
+    def wait(self, timeout=None):
+        """
+        Wait for the worker to finish and get the results
+        
+        Raises the task's exception if one failed.
+        """
+        self.start()
+        self.thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.results
@@ -0,0 +1,277 @@
+# Scenario benchmarks for GemRush: drives scripted scenarios through the real
+# game code under the SDL dummy video driver and reports frame and per-stage
+# p50/p95/p99 as JSON, optionally gating on a stored baseline. Baselines
+# depend on the machine, so keep them with the CI job rather than in the repo
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout pure JSON
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+
+import pygame
+
+from game_session import GameSession, TICK_RATE
+from game_renderer import GameRenderer, DirtyRectRenderer
+from frame_profiler import FrameProfiler
+from leaderboard import Leaderboard
+
+WIDTH, HEIGHT = 800, 600
+
+# Simulated time per rendered frame; the session runs at TICK_RATE underneath
+FRAME_TIME = 1 / 60
+
+# Stats compared against the baseline
+GATED_STATS = ('p50', 'p95')
+
+# A scripted run of the game: sets up a session and renderer, then feeds
+# input every frame
+class Scenario:
+    name = None
+    description = ""
+    
+    def setup(self, session, renderer):
+        session.start_game()
+    
+    def get_input(self, session, frame):
+        return (0, 0)
+
+class IdleLevel1(Scenario):
+    name = "idle_level1"
+    description = "Level 1 with the player standing still"
+
+class PickupStorm(Scenario):
+    name = "pickup_storm"
+    description = "Level 3 with a gem collected every few frames"
+    
+    def setup(self, session, renderer):
+        session.start_game()
+        
+        # Go to level 3 without starting the level fade
+        session.on_level_start = None
+        session.next_level()
+        session.next_level()
+        renderer.light_effect.clear_lights()
+        renderer.add_gem_lights(session.gems)
+        
+        # Stay on level 3, replacing every collected gem with a new one
+        session.gems_required = float('inf')
+        handle_gem_collected = session.on_gem_collected
+        def refill(gem):
+            handle_gem_collected(gem)
+            renderer.add_gem_lights(session.create_gems(1))
+        session.on_gem_collected = refill
+    
+    def get_input(self, session, frame):
+        # Jump onto a gem every third frame, collecting it on the next tick
+        if frame % 3 == 0 and len(session.gems):
+            gem = next(iter(session.gems))
+            session.player.reset(gem.rect.center)
+        return (0, 0)
+
+class NightSky(Scenario):
+    name = "night_sky"
+    description = "Level 1 under a starry sky, player walking in circles"
+    
+    def setup(self, session, renderer):
+        session.start_game()
+        background = renderer.background
+        background.day_cycle_speed = 0
+        background.time_of_day = 0.97
+        background.update([0, 0])
+    
+    def get_input(self, session, frame):
+        directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        return directions[(frame // 60) % 4]
+
+class ManyGems(Scenario):
+    name = "gems_500"
+    description = "A stress level with 500 gems and their lights"
+    
+    def setup(self, session, renderer):
+        session.start_game()
+        session.gem_pool.release_all(session.gems)
+        session.gems_required = 500
+        renderer.light_effect.clear_lights()
+        renderer.add_gem_lights(session.create_gems(500))
+    
+    def get_input(self, session, frame):
+        directions = [(1, 1), (-1, 1), (-1, -1), (1, -1)]
+        return directions[(frame // 90) % 4]
+
+class LeaderboardScreen(Scenario):
+    name = "leaderboard"
+    description = "Game over with the leaderboard open"
+    
+    def setup(self, session, renderer):
+        session.leaderboard = Leaderboard()
+        for i in range(session.leaderboard.max_entries):
+            session.leaderboard.add_entry(100 + i * 10, 60 + i, 3)
+        session.start_game()
+        session.game_timer.time_left = 0
+        session.game_timer.update(0)
+        renderer.show_leaderboard = True
+
+SCENARIOS = {scenario.name: scenario for scenario in
+             (IdleLevel1, PickupStorm, NightSky, ManyGems, LeaderboardScreen)}
+
+def run_scenario(scenario, screen, frames=600, warmup=60, seed=0, renderer_class=GameRenderer):
+    """Run a scenario and get its frame and per-stage statistics"""
+    profiler = FrameProfiler(history=frames, enabled=True)
+    session = GameSession(WIDTH, HEIGHT, profiler=profiler, seed=f"{seed}/{scenario.name}")
+    renderer = renderer_class(screen, session, profiler=profiler)
+    session.on_level_start = renderer.handle_level_start
+    session.on_gem_collected = renderer.handle_gem_collected
+    scenario.setup(session, renderer)
+    
+    # Share of the screen pushed to the display each measured frame
+    screen_rect = screen.get_rect()
+    screen_area = screen_rect.width * screen_rect.height
+    updated = []
+    
+    step = 1 / TICK_RATE
+    accumulator = 0.0
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            profiler.reset()
+        profiler.begin_frame()
+        pygame.event.pump()
+        direction = scenario.get_input(session, frame)
+        profiler.mark('events')
+        
+        accumulator += FRAME_TIME
+        while accumulator >= step:
+            session.step(direction, step)
+            accumulator -= step
+        renderer.update(FRAME_TIME)
+        dirty_rects = renderer.draw(accumulator / step)
+        
+        if dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects)
+        profiler.mark('flip')
+        profiler.end_frame()
+        
+        if frame >= warmup:
+            if dirty_rects is None or screen_rect in dirty_rects:
+                updated.append(1.0)
+            else:
+                updated.append(min(1.0, sum(rect.width * rect.height for rect in dirty_rects) / screen_area))
+    
+    stats = profiler.get_stats()
+    return {
+        'description': scenario.description,
+        'frames': frames,
+        'frame': stats.pop('frame'),
+        'stages': stats,
+        'screen_updated': {
+            'mean': sum(updated) / len(updated) if updated else 0.0,
+            'full_frames': updated.count(1.0)
+        }
+    }
+
+def compare(results, baseline, threshold):
+    """Get a list of regressions of the gated frame stats beyond threshold"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline.get('scenarios', {}):
+            continue
+        base_frame = baseline['scenarios'][name]['frame']
+        for stat in GATED_STATS:
+            base, current = base_frame[stat], result['frame'][stat]
+            if base > 0 and current > base * (1 + threshold):
+                regressions.append(f"{name} frame {stat}: {current:.3f} ms vs {base:.3f} ms baseline "
+                                   f"(+{(current / base - 1) * 100:.0f}%)")
+        
+        # Coverage only depends on the seed, so growth means a renderer
+        # started pushing more of the screen (e.g. fell back to full frames)
+        base = baseline['scenarios'][name].get('screen_updated', {}).get('mean', 0.0)
+        current = result['screen_updated']['mean']
+        if base > 0 and current > base * (1 + threshold):
+            regressions.append(f"{name} screen updated: {current:.1%} vs {base:.1%} baseline")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run GemRush scenario benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--frames", type=int, default=600, help="Measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="Unmeasured frames before measuring")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for each scenario")
+    parser.add_argument("--dirty-rects", action="store_true", help="Use the dirty-rect renderer")
+    parser.add_argument("--output", help="Write the results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed slowdown of frame p50/p95 over the baseline (0.15 = 15%%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the results to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+    
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline needs --baseline")
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    output_path = os.path.abspath(args.output) if args.output else None
+    
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    
+    # Run in a scratch directory so the leaderboard scenario doesn't touch
+    # the player's saved scores
+    results = {}
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name in args.scenario or list(SCENARIOS):
+                print(f"Running {name}...", file=sys.stderr)
+                results[name] = run_scenario(SCENARIOS[name](), screen, args.frames, args.warmup, args.seed,
+                                             DirtyRectRenderer if args.dirty_rects else GameRenderer)
+        finally:
+            os.chdir(start_dir)
+    pygame.quit()
+    
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'tick_rate': TICK_RATE,
+            'frames': args.frames,
+            'seed': args.seed,
+            'dirty_rects': args.dirty_rects
+        },
+        'scenarios': results
+    }
+    text = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    
+    if baseline_path is None:
+        return 0
+    
+    if args.update_baseline:
+        with open(baseline_path, "w") as f:
+            f.write(text + "\n")
+        print(f"Baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+    
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if regressions:
+        return 1
+    print("No regressions", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import pygame
+import time
+from collections import deque
+
+# Times each stage of a frame and shows rolling percentiles in an overlay
+class FrameProfiler:
+    def __init__(self, history=240, enabled=False, refresh_interval=15):
+        """
+        Initialize a frame profiler
+        
+        Call begin_frame() at the start of a frame, mark(name) after each
+        stage and end_frame() once the frame is done. While disabled these
+        return immediately, so the calls can stay in the game loop.
+        
+        Args:
+            history: Number of frames the percentiles are taken over
+            enabled: Whether to start recording straight away
+            refresh_interval: Frames between redraws of the overlay panel
+        """
+        self.enabled = enabled
+        self.history = history
+        self.refresh_interval = refresh_interval
+        
+        self.frame_times = deque(maxlen=history)
+        self.stage_times = {}  # Stage name -> deque of seconds, in first-seen order
+        self.current = {}      # Stage name -> seconds spent so far this frame
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.frames = 0
+        
+        # Overlay
+        self.font = None
+        self.panel = None
+        self.graph_ms = 50  # Frame time at the top of the graph
+    
+    def toggle(self):
+        """Turn recording and the overlay on or off"""
+        self.enabled = not self.enabled
+        self.reset()
+    
+    def reset(self):
+        """Forget all recorded frames"""
+        self.frame_times.clear()
+        self.stage_times.clear()
+        self.current.clear()
+        self.frames = 0
+        self.panel = None
+    
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.current.clear()
+    
+    def mark(self, name):
+        """Charge the time since the previous mark to a stage"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self.last_mark
+        self.last_mark = now
+    
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.frame_times.append(time.perf_counter() - self.frame_start)
+        
+        # Stages that didn't run this frame count as zero so every stage
+        # is measured over the same frames
+        for name in self.current:
+            if name not in self.stage_times:
+                self.stage_times[name] = deque(maxlen=self.history)
+        for name, samples in self.stage_times.items():
+            samples.append(self.current.get(name, 0.0))
+        self.frames += 1
+    
+    @staticmethod
+    def percentiles(samples, points=(50, 95, 99)):
+        """Get the given percentiles of a sequence (nearest rank)"""
+        ordered = sorted(samples)
+        if not ordered:
+            return [0.0 for _ in points]
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(point / 100 * last)))] for point in points]
+    
+    def get_stats(self):
+        """Get p50/p95/p99 and mean in milliseconds for the frame and each stage"""
+        stats = {}
+        for name, samples in [('frame', self.frame_times)] + list(self.stage_times.items()):
+            p50, p95, p99 = self.percentiles(samples)
+            mean = sum(samples) / len(samples) if samples else 0.0
+            stats[name] = {
+                'p50': p50 * 1000,
+                'p95': p95 * 1000,
+                'p99': p99 * 1000,
+                'mean': mean * 1000
+            }
+        return stats
+    
+    def draw(self, surface, x=10, y=100):
+        """Draw the overlay and get the rect it covers (the panel is only rebuilt every few frames)"""
+        if not self.enabled:
+            return None
+        if self.panel is None or self.frames % self.refresh_interval == 0:
+            self.panel = self.render_panel()
+        return surface.blit(self.panel, (x, y))
+    
+    def render_panel(self):
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 18)
+        font = self.font
+        line_height = font.get_linesize()
+        stats = self.get_stats()
+        
+        graph_width, graph_height = 260, 60
+        width = graph_width + 20
+        height = line_height * (len(stats) + 1) + graph_height + 30
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        
+        # Percentile table
+        columns = (10, 140, 190, 240)
+        for column, text in zip(columns, ("ms", "p50", "p95", "p99")):
+            panel.blit(font.render(text, True, (200, 200, 200)), (column, 8))
+        row_y = 8 + line_height
+        for name, values in stats.items():
+            color = (255, 255, 0) if name == 'frame' else (255, 255, 255)
+            panel.blit(font.render(name, True, color), (columns[0], row_y))
+            for column, key in zip(columns[1:], ('p50', 'p95', 'p99')):
+                panel.blit(font.render(f"{values[key]:.2f}", True, color), (column, row_y))
+            row_y += line_height
+        
+        # Frame-time graph, newest frame on the right
+        graph = pygame.Rect(10, row_y + 10, graph_width, graph_height)
+        pygame.draw.rect(panel, (40, 40, 40, 200), graph)
+        scale = graph_height / self.graph_ms
+        for budget_ms, color in ((1000 / 60, (0, 200, 0)), (1000 / 30, (200, 150, 0))):
+            line_y = graph.bottom - int(budget_ms * scale)
+            pygame.draw.line(panel, color, (graph.left, line_y), (graph.right - 1, line_y))
+        samples = list(self.frame_times)[-graph_width:]
+        offset = graph.right - len(samples)
+        for i, seconds in enumerate(samples):
+            bar_height = min(graph_height, int(seconds * 1000 * scale))
+            color = (255, 80, 80) if seconds * 1000 > 1000 / 60 else (120, 200, 255)
+            pygame.draw.line(panel, color, (offset + i, graph.bottom - 1), (offset + i, graph.bottom - bar_height))
+        
+        return panel
@@ -0,0 +1,510 @@
+import pygame
+import copy
+import numpy as np
+
+from improved_background import ParallaxBackground
+from improved_gems import GEM_COLORS
+from improved_effects import ParticleSystem, LightEffect, ScreenTransition, PRIORITY_SPARKLE
+from improved_ui import ImprovedUI
+from frame_profiler import FrameProfiler
+from game_session import derive_rng
+
+# Every gem carries a light of its own color
+GEM_LIGHT_RADIUS = 50
+GEM_LIGHT_INTENSITY = 0.3
+
+# Draws a GameSession and owns everything that is purely visual
+class GameRenderer:
+    def __init__(self, screen, session, max_particles=3000, lightmap_scale=1.0, light_accumulator='blit',
+                 profiler=None, background=None, light_effect=None):
+        """
+        Initialize a renderer for a game session
+        
+        Args:
+            screen: Surface to draw to
+            session: GameSession to draw
+            max_particles: Upper bound on live particles
+            lightmap_scale: Resolution of the light map relative to the screen
+            light_accumulator: 'blit' or 'numpy' light compositing
+            profiler: FrameProfiler that update() and draw() report their stages to
+            background: Background from create_background() (e.g. baked behind
+                the loading screen), or None to create it here
+            light_effect: Light effect from create_light_effect(), or None to
+                create it here
+        """
+        self.screen = screen
+        self.session = session
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.width, self.height = screen.get_size()
+        
+        # Random streams for the scenery, particles and particle spawns,
+        # derived from the session's seed
+        self.rng = derive_rng(session.seed, "spawns")
+        
+        # Create background
+        if background is None:
+            background = self.create_background(self.width, self.height, session.seed)
+        self.background = background
+        self.parallax_scrolling = True  # Whether the layers scroll as the player moves
+        
+        # Create effects
+        self.particle_system = ParticleSystem(max_particles, rng=derive_rng(session.seed, "particles"))
+        if light_effect is None:
+            light_effect = self.create_light_effect(self.width, self.height, lightmap_scale, light_accumulator)
+        self.light_effect = light_effect
+        self.screen_transition = ScreenTransition(self.width, self.height)
+        
+        # Create UI
+        self.ui = ImprovedUI(self.width, self.height)
+        self.show_leaderboard = False
+        self.levels_started = 0
+        
+        # Exit button on the victory screen
+        exit_button_width = 180  # Updated to match UI change
+        exit_button_height = 50  # Updated to match UI change
+        self.exit_button_rect = pygame.Rect(self.width // 2 - exit_button_width // 2, self.height // 2 + 220,
+                                            exit_button_width, exit_button_height)
+    
+    @staticmethod
+    def create_background(width, height, seed):
+        """Create the scenery for a session seed (drawing only to its own surfaces)"""
+        background = ParallaxBackground(width, height, rng=derive_rng(seed, "background"))
+        # Set day cycle speed - adjust this to control how fast day/night changes
+        background.day_cycle_speed = 0.0001  # Slower cycle for better atmosphere
+        return background
+    
+    @classmethod
+    def create_light_effect(cls, width, height, lightmap_scale=1.0, light_accumulator='blit'):
+        """Create the light effect with the gem light textures already drawn"""
+        light_effect = LightEffect(width, height, lightmap_scale, light_accumulator)
+        for color in GEM_COLORS.values():
+            light_effect.preload_light(GEM_LIGHT_RADIUS, color, GEM_LIGHT_INTENSITY)
+        return light_effect
+    
+    def handle_level_start(self, level):
+        """Give the new level's gems their lights and fade in"""
+        self.light_effect.clear_lights()
+        self.add_gem_lights(self.session.gems)
+        
+        # The first level starts straight after the loading screen
+        if self.levels_started > 0:
+            self.screen_transition.start('fade', 'out', 0.02)
+        self.levels_started += 1
+        self.show_leaderboard = False
+    
+    def add_gem_lights(self, gems):
+        """Add a light to each gem, following the gem as it bobs"""
+        for gem in gems:
+            gem.light_handle = self.light_effect.add_light(gem.rect.centerx, gem.rect.centery, GEM_LIGHT_RADIUS,
+                                                           gem.color, GEM_LIGHT_INTENSITY, sprite=gem)
+    
+    def handle_gem_collected(self, gem):
+        """Burst of particles where a gem was collected"""
+        self.particle_system.create_collection_effect(
+            gem.rect.centerx,
+            gem.rect.centery,
+            gem.color,
+            30
+        )
+        
+        # Remove the gem's light
+        self.light_effect.remove_light(gem.light_handle)
+    
+    def exit_clicked(self, pos):
+        """Whether a click at pos hits the victory screen's exit button"""
+        return self.session.victory and not self.show_leaderboard and self.exit_button_rect.collidepoint(pos)
+    
+    def update(self, dt):
+        """Advance the visual-only state by dt seconds (once per rendered frame)"""
+        session = self.session
+        player = session.player
+        steps = dt * 60  # Spawn chances are per 1/60 s
+        profiler = self.profiler
+        rng = self.rng
+        
+        if session.playing:
+            # Create trail particles behind player
+            if rng.random() < 0.2 * steps:
+                self.particle_system.create_trail_effect(
+                    player.rect.centerx + rng.uniform(-10, 10),
+                    player.rect.centery + rng.uniform(-10, 10),
+                    (50, 100, 255)
+                )
+            
+            # Create sparkle effects on gems (skipped once sparkles are over budget)
+            if self.particle_system.can_emit(PRIORITY_SPARKLE):
+                for gem in session.gems:
+                    if rng.random() < 0.05 * steps:
+                        self.particle_system.create_sparkle_effect(
+                            gem.rect.centerx,
+                            gem.rect.centery,
+                            gem.color
+                        )
+            profiler.mark('particle_spawn')
+            
+            # Update background based on player movement
+            if self.parallax_scrolling:
+                player_movement = [player.direction.x * player.speed * 0.1,
+                                   player.direction.y * player.speed * 0.1]
+            else:
+                player_movement = [0, 0]
+            self.background.update(player_movement, dt)
+            profiler.mark('background_update')
+        
+        # Update particles
+        self.particle_system.update(dt)
+        profiler.mark('particle_update')
+        
+        # Update UI
+        self.ui.update(dt)
+        
+        # Update screen transition
+        self.screen_transition.update(dt)
+        profiler.mark('ui_update')
+    
+    def draw(self, alpha=1.0):
+        """
+        Draw the current frame (without flipping the display)
+        
+        Args:
+            alpha: How far between the last two simulation ticks to draw
+                moving sprites (0 = previous tick, 1 = latest tick)
+        """
+        screen = self.screen
+        session = self.session
+        ui = self.ui
+        profiler = self.profiler
+        
+        # Draw background
+        self.background.draw(screen)
+        profiler.mark('background_draw')
+        
+        # Draw the player, then the gems, at their interpolated positions
+        player = session.player
+        draw_pos = player.prev_pos.lerp(player.pos, alpha)
+        screen.blit(player.image, player.image.get_rect(center=(round(draw_pos.x), round(draw_pos.y))))
+        session.gems.draw_interpolated(screen, alpha)
+        profiler.mark('sprites')
+        
+        # Draw particles
+        self.particle_system.draw(screen)
+        profiler.mark('particle_draw')
+        
+        # Draw lights
+        light_surface = self.light_effect.render()
+        screen.blit(light_surface, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+        profiler.mark('lights')
+        
+        # Draw UI
+        for key, draw in self.get_hud_items():
+            draw(screen)
+        
+        # Draw game over / victory screens
+        if session.game_over or session.victory:
+            if self.show_leaderboard:
+                self.draw_leaderboard()
+            elif session.game_over:
+                ui.draw_game_over_screen(screen, session.score, session.high_score)
+                self.draw_leaderboard_hint()
+            else:
+                ui.draw_victory_screen(screen, session.score, session.high_score)
+                
+                # Draw time played
+                minutes = int(session.total_time_played) // 60
+                seconds = int(session.total_time_played) % 60
+                time_text = ui.medium_font.render(f"Time: {minutes:02d}:{seconds:02d}", True, (255, 255, 255))
+                screen.blit(time_text, (self.width // 2 - time_text.get_width() // 2, self.height // 2 + 90))
+                
+                self.draw_leaderboard_hint()
+        
+        # Draw transition effect
+        if self.screen_transition.active:
+            transition_surface = self.screen_transition.render()
+            if transition_surface:
+                screen.blit(transition_surface, (0, 0))
+        profiler.mark('ui')
+    
+    def get_hud_items(self):
+        """
+        Get (key, draw) for each HUD element
+        
+        key changes whenever the element would look different and draw(surface)
+        draws it in its place on the screen.
+        """
+        session = self.session
+        ui = self.ui
+        
+        # The score pulses for a while after it changes
+        score_animation = ui.animations.get('score')
+        items = [
+            (('score', session.score, score_animation['timer'] if score_animation else 0),
+             lambda surface: ui.draw_score_display(surface, 20, 20, session.score)),
+            (('gems', session.gems_collected, session.gems_required),
+             lambda surface: ui.draw_gem_counter(surface, self.width // 2 - 50, 20,
+                                                 session.gems_collected, session.gems_required)),
+            (('level', session.level, session.num_levels),
+             lambda surface: ui.draw_level_indicator(surface, self.width - 100, 20,
+                                                     session.level, session.num_levels))
+        ]
+        
+        # Timer
+        if session.playing:
+            timer = session.game_timer
+            fill_width = int(300 * max(0, min(1, timer.time_left / timer.initial_time)))
+            items.append((('timer', timer.get_time_string(), fill_width, timer.get_color()),
+                          lambda surface: timer.draw(surface, 250, 60, 300, 20, True, ui.small_font)))
+        return items
+    
+    def draw_leaderboard_hint(self):
+        # Draw additional instructions - moved lower
+        instructions = self.ui.small_font.render("Press L to view leaderboard", True, (255, 255, 255))
+        self.screen.blit(instructions, (self.width // 2 - instructions.get_width() // 2, self.height // 2 + 200))
+    
+    def draw_leaderboard(self):
+        ui = self.ui
+        if self.session.leaderboard is not None:
+            self.session.leaderboard.draw(self.screen, self.width // 2 - 350, self.height // 2 - 250, 700, 500,
+                                          ui.title_font, ui.medium_font, ui.small_font)
+        
+        # Draw back button instruction
+        back_text = ui.small_font.render("Press L to return", True, (255, 255, 255))
+        self.screen.blit(back_text, (self.width // 2 - back_text.get_width() // 2, self.height - 50))
+
+# Layers of the dirty-rect renderer's sprites, back to front
+SKY_LAYER, PLAYER_LAYER, GEM_LAYER, LIGHT_LAYER, HUD_LAYER = range(5)
+
+# A DirtySprite showing an image owned by something else, only marked dirty
+# when the image or its position changes
+class SpriteView(pygame.sprite.DirtySprite):
+    def __init__(self, blendmode=0):
+        super().__init__()
+        self.blendmode = blendmode
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+    
+    def show(self, image, topleft):
+        if image is not self.image or topleft != self.rect.topleft:
+            self.image = image
+            self.rect = image.get_rect(topleft=topleft)
+            self.dirty = 1
+
+# Redraws only the parts of the screen that changed, for machines where
+# filling the whole screen every frame is the bottleneck
+class DirtyRectRenderer(GameRenderer):
+    HUD_HEIGHT = 120  # Every HUD element is drawn inside this band at the top
+    
+    def __init__(self, screen, session, max_particles=3000, lightmap_scale=1.0, light_accumulator='blit',
+                 profiler=None, background=None, light_effect=None, particle_tile_size=64):
+        """
+        Initialize a dirty-rect renderer for a game session
+        
+        draw() returns the rects that changed, to be pushed with
+        pygame.display.update() instead of flipping. The background layers
+        are the clear surface, so they don't scroll with the player, and
+        particles are drawn over the lights and HUD. Lights are blitted one by
+        one at full resolution, so lightmap_scale and light_accumulator only
+        apply to the full-screen frames drawn under overlays and fades.
+        
+        Args:
+            screen: Surface to draw to, kept between frames
+            session: GameSession to draw
+            max_particles: Upper bound on live particles
+            lightmap_scale: Resolution of the light map relative to the screen
+            light_accumulator: 'blit' or 'numpy' light compositing
+            profiler: FrameProfiler that update() and draw() report their stages to
+            background: Background from create_background(), or None to create it here
+            light_effect: Light effect from create_light_effect(), or None to create it here
+            particle_tile_size: Size of the tiles particle coverage is snapped to
+        """
+        super().__init__(screen, session, max_particles, lightmap_scale, light_accumulator, profiler,
+                         background, light_effect)
+        self.parallax_scrolling = False
+        self.particle_tile_size = particle_tile_size
+        
+        # LayeredDirty falls back to redrawing the whole screen once a frame
+        # takes longer than its timing threshold, which on the slow machines
+        # this renderer is for would be every frame, so keep it on rects
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.sprites.set_timing_threshold(float('inf'))
+        self.screen_rect = screen.get_rect()
+        
+        # Views keyed by what they show, one dict per kind of sprite
+        self.sky_views = {}
+        self.player_views = {}
+        self.gem_views = {}
+        self.light_views = {}
+        self.hud_views = {}
+        
+        # HUD elements are rendered into the scratch bands only when their key
+        # changes, then cropped to what was drawn
+        self.hud_black = pygame.Surface((self.width, self.HUD_HEIGHT))
+        self.hud_white = pygame.Surface((self.width, self.HUD_HEIGHT))
+        self.hud_cache = {}  # Index -> (key, image, topleft), image None if nothing was drawn
+        
+        self.composite_key = None
+        self.full_repaint = True
+        self.particle_rects = []  # Where particles were drawn last frame
+        self.repaint_rects = []   # Drawn over by someone else since the last frame
+    
+    @classmethod
+    def create_light_effect(cls, width, height, lightmap_scale=1.0, light_accumulator='blit'):
+        """Create the light effect with the gem light textures already drawn"""
+        light_effect = super().create_light_effect(width, height, lightmap_scale, light_accumulator)
+        # Lights are also blitted one by one at full resolution
+        for color in GEM_COLORS.values():
+            light_effect.get_light_texture(GEM_LIGHT_RADIUS, color, GEM_LIGHT_INTENSITY)
+        return light_effect
+    
+    def repaint_rect(self, rect):
+        """Restore a region drawn over outside the renderer on the next frame"""
+        self.repaint_rects.append(pygame.Rect(rect))
+    
+    @staticmethod
+    def merge_rects(rects):
+        """Get rects covering the same area with no two overlapping"""
+        merged = []
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            index = rect.collidelist(merged)
+            while index > -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+    
+    def sync_views(self, views, layer, blits, blendmode=0):
+        """Show one view per (key, image, topleft) and drop the views of keys that are gone"""
+        seen = set()
+        for key, image, topleft in blits:
+            view = views.get(key)
+            if view is None:
+                view = views[key] = SpriteView(blendmode)
+                self.sprites.add(view, layer=layer)
+            view.show(image, topleft)
+            seen.add(key)
+        if len(seen) != len(views):
+            for key in [key for key in views if key not in seen]:
+                self.sprites.remove(views.pop(key))
+    
+    def render_hud_element(self, draw):
+        """
+        Render a HUD element to a premultiplied-alpha image and get it with its position
+        
+        Text is drawn over its own semi-transparent shadow, which pygame's
+        alpha blending can't collapse into one SRCALPHA image. Drawn over
+        black and over white instead, the difference between the two is how
+        much background shows through each pixel and the black pass is the
+        color on top of it.
+        """
+        black, white = self.hud_black, self.hud_white
+        black.fill((0, 0, 0))
+        white.fill((255, 255, 255))
+        
+        # Drawing can start UI animations, so both passes start from the same state
+        animations = copy.deepcopy(self.ui.animations)
+        draw(black)
+        self.ui.animations = animations
+        draw(white)
+        
+        # Find what was drawn on the packed pixels, then work on just that
+        covered = ((pygame.surfarray.pixels2d(black) != black.map_rgb((0, 0, 0))) |
+                   (pygame.surfarray.pixels2d(white) != white.map_rgb((255, 255, 255))))
+        columns = np.flatnonzero(covered.any(axis=1))
+        rows = np.flatnonzero(covered.any(axis=0))
+        if len(columns) == 0:
+            return None, (0, 0)
+        left, right, top, bottom = columns[0], columns[-1] + 1, rows[0], rows[-1] + 1
+        
+        color = pygame.surfarray.array3d(black.subsurface(left, top, right - left, bottom - top))
+        over_white = pygame.surfarray.array3d(white.subsurface(left, top, right - left, bottom - top))
+        alpha = 255 - (over_white.astype(np.int16) - color).max(axis=2)
+        
+        image = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+        pygame.surfarray.pixels3d(image)[...] = color
+        pygame.surfarray.pixels_alpha(image)[...] = alpha
+        return image, (int(left), int(top))
+    
+    def get_hud_blits(self):
+        """Get (index, image, topleft) for each HUD element, re-rendering the ones that changed"""
+        blits = []
+        for index, (key, draw) in enumerate(self.get_hud_items()):
+            cached = self.hud_cache.get(index)
+            if cached is None or cached[0] != key:
+                cached = self.hud_cache[index] = (key, *self.render_hud_element(draw))
+            if cached[1] is not None:
+                blits.append((index, cached[1], cached[2]))
+        return blits
+    
+    def draw(self, alpha=1.0):
+        """
+        Draw the parts of the current frame that changed
+        
+        Args:
+            alpha: How far between the last two simulation ticks to draw
+                moving sprites (0 = previous tick, 1 = latest tick)
+        
+        Returns:
+            List of rects to pass to pygame.display.update(), or None if the
+            whole screen was redrawn and should be flipped
+        """
+        session = self.session
+        background = self.background
+        profiler = self.profiler
+        
+        # Overlays and fades cover the whole screen, so draw those frames in full
+        if session.game_over or session.victory or self.screen_transition.active:
+            super().draw(alpha)
+            self.full_repaint = True
+            return None
+        
+        # Layer offsets only change when the camera is moved, which settles
+        # the composite on the second call
+        composite = background.get_composite()
+        if composite is None:
+            composite = background.get_composite()
+        if self.full_repaint or background.composite_key != self.composite_key:
+            self.sprites.repaint_rect(self.screen_rect)
+            self.composite_key = background.composite_key
+            self.full_repaint = False
+        
+        self.sync_views(self.sky_views, SKY_LAYER,
+                        [(index, image, topleft) for index, (image, topleft) in enumerate(background.get_sky_blits())])
+        profiler.mark('background_draw')
+        
+        # Player and gems at their interpolated positions
+        player = session.player
+        draw_pos = player.prev_pos.lerp(player.pos, alpha)
+        player_rect = player.image.get_rect(center=(round(draw_pos.x), round(draw_pos.y)))
+        self.sync_views(self.player_views, PLAYER_LAYER, [(player, player.image, player_rect.topleft)])
+        gems = session.gems
+        self.sync_views(self.gem_views, GEM_LAYER,
+                        [(gem, gem.image, (gem.rect.x, draw_y))
+                         for gem, draw_y in zip(gems.gems_by_slot, gems.get_interpolated_y(alpha))])
+        profiler.mark('sprites')
+        
+        self.sync_views(self.light_views, LIGHT_LAYER, self.light_effect.get_light_blits(), pygame.BLEND_RGB_ADD)
+        profiler.mark('lights')
+        
+        self.sync_views(self.hud_views, HUD_LAYER, self.get_hud_blits(), pygame.BLEND_PREMULTIPLIED)
+        profiler.mark('ui')
+        
+        # Restore what last frame's particles and any overlays drew over.
+        # LayeredDirty only merges these where they meet a dirty sprite, and
+        # where they overlap each other the additive lights would be drawn twice
+        for rect in self.particle_rects + self.repaint_rects:
+            self.sprites.repaint_rect(rect)
+        self.repaint_rects = []
+        self.sprites.lostsprites[:] = self.merge_rects(self.sprites.lostsprites)
+        rects = self.sprites.draw(self.screen, composite)
+        profiler.mark('dirty_draw')
+        
+        # Particles change every frame, so they are drawn over the sprites
+        # and their tiles repainted on the next frame
+        self.particle_system.draw(self.screen)
+        screen_rect = self.screen_rect
+        self.particle_rects = [rect.clip(screen_rect) for rect in
+                               self.particle_system.get_dirty_rects(self.particle_tile_size)
+                               if rect.colliderect(screen_rect)]
+        profiler.mark('particle_draw')
+        
+        return rects + self.particle_rects
@@ -0,0 +1,297 @@
+import pygame
+import random
+import time
+
+from improved_player import ImprovedPlayer
+from improved_gems import GemPool, GemField
+from game_timer import GameTimer
+from spatial_hash import SpatialHash
+from gem_placement import GemPlacer
+from frame_profiler import FrameProfiler
+
+# Simulation rate in ticks per second. Rendering runs independently of this
+TICK_RATE = 120
+
+# Seconds added to the timer when a gem of each type is collected
+TIME_BONUS = {
+    "diamond": 5,
+    "ruby": 4,
+    "emerald": 3,
+    "sapphire": 2,
+    "topaz": 1
+}
+
+def derive_rng(seed, name):
+    """
+    Get the random stream for one subsystem of a seeded game
+    
+    Every subsystem draws from its own stream, so extra draws in one (say a
+    new particle effect) don't change the world another one generates.
+    Without a seed the stream is seeded from the OS.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}/{name}")
+
+# Game state and rules, stepped from an input vector with no rendering
+class GameSession:
+    def __init__(self, width=800, height=600, level_times=(60, 50, 40), num_levels=3,
+                 leaderboard=None, high_score_file=None, profiler=None, seed=None):
+        """
+        Initialize a game session
+        
+        Args:
+            width: Width of the play area
+            height: Height of the play area
+            level_times: Time in seconds for each level
+            num_levels: Number of levels to clear for victory
+            leaderboard: Leaderboard that finished games are added to, or None
+            high_score_file: File the high score is loaded from and saved to,
+                or None to keep it in memory only
+            profiler: FrameProfiler that step() reports its stages to
+            seed: Seed every random stream in the game is derived from
+                (gems, placement and, through GameRenderer, the scenery and
+                particles), or None for a different game each time
+        """
+        self.width = width
+        self.height = height
+        self.level_times = list(level_times)
+        self.num_levels = num_levels
+        self.leaderboard = leaderboard
+        self.high_score_file = high_score_file
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.seed = seed
+        
+        # Game variables
+        self.score = 0
+        self.level = 1
+        self.gems_collected = 0
+        self.gems_required = 10
+        self.game_active = False
+        self.game_over = False
+        self.victory = False
+        self.high_score = self.load_high_score()
+        self.total_time_played = 0
+        self.ticks = 0
+        
+        # Sprites
+        self.gem_grid = SpatialHash(64)  # Broad phase for player/gem collisions
+        self.gems = GemField(spatial_hash=self.gem_grid)
+        self.gem_pool = GemPool(rng=derive_rng(seed, "gems"))  # Gems are recycled between levels instead of rebuilt
+        
+        self.spawn_point = (width // 2, height // 2)
+        self.player = ImprovedPlayer()
+        self.player.reset(self.spawn_point)
+        
+        # Gem placement - spaced out, away from the HUD and the player's spawn point
+        hud_rect = pygame.Rect(0, 0, width, 90)
+        spawn_zone = pygame.Rect(0, 0, 150, 150)
+        spawn_zone.center = self.spawn_point
+        self.gem_placer = GemPlacer(pygame.Rect(70, 70, width - 100, height - 100), min_distance=60,
+                                    keep_out=[hud_rect, spawn_zone], rng=derive_rng(seed, "placement"))
+        
+        # Timer
+        self.game_timer = GameTimer(self.get_level_time(), 20, 10)
+        self.game_timer.on_timeout = self.handle_timeout
+        
+        # Callback functions
+        self.on_gem_collected = None  # Called with the gem before it is recycled
+        self.on_level_start = None    # Called with the level number once its gems are placed
+        self.on_game_over = None
+        self.on_victory = None
+    
+    @property
+    def playing(self):
+        """Whether the game is running (not over, won or yet to start)"""
+        return self.game_active and not self.game_over and not self.victory
+    
+    def load_high_score(self):
+        if self.high_score_file is None:
+            return 0
+        try:
+            with open(self.high_score_file, "r") as f:
+                return int(f.read())
+        except:
+            return 0
+    
+    def save_high_score(self):
+        if self.high_score_file is None:
+            return
+        try:
+            with open(self.high_score_file, "w") as f:
+                f.write(str(self.high_score))
+        except:
+            pass
+    
+    def get_level_time(self):
+        """Get the time limit for the current level"""
+        if self.level <= len(self.level_times):
+            return self.level_times[self.level - 1]
+        return 30  # Default time if we run out of predefined times
+    
+    def create_gems(self, count):
+        """Place count new gems away from the player and get them as a list"""
+        positions = self.gem_placer.place(count, keep_out=[self.player.rect.inflate(100, 100)])
+        created = []
+        for x, y in positions:
+            # Gems are positioned by their top-left corner
+            gem = self.gem_pool.acquire(x=int(x) - 20, y=int(y) - 20)
+            self.gems.add(gem)
+            created.append(gem)
+        return created
+    
+    def start_game(self):
+        """Start (or restart) a game from level 1"""
+        self.game_over = False
+        self.victory = False
+        self.game_active = True
+        self.score = 0
+        self.level = 1
+        self.gems_collected = 0
+        self.gems_required = 10
+        self.total_time_played = 0
+        self.ticks = 0
+        
+        # Reset timer
+        self.game_timer.reset(self.get_level_time())
+        
+        # Return gems to the pool and put the player back at the start
+        self.gem_pool.release_all(self.gems)
+        self.player.reset(self.spawn_point)
+        
+        # Create initial gems
+        self.create_gems(self.gems_required)
+        
+        if self.on_level_start:
+            self.on_level_start(self.level)
+    
+    def next_level(self):
+        """Advance to the next level"""
+        # Return existing gems to the pool
+        self.gem_pool.release_all(self.gems)
+        
+        # Reset variables
+        self.gems_collected = 0
+        self.level += 1
+        self.gems_required = 10 + (self.level - 1) * 5  # Increase required gems each level
+        
+        # Reset timer with new level time
+        self.game_timer.reset(self.get_level_time())
+        
+        # Create new gems
+        self.create_gems(self.gems_required)
+        
+        # Reset player position
+        self.player.reset(self.spawn_point)
+        
+        if self.on_level_start:
+            self.on_level_start(self.level)
+    
+    def handle_timeout(self):
+        self.game_active = False
+        self.game_over = True
+        if self.on_game_over:
+            self.on_game_over()
+    
+    def handle_victory(self):
+        self.victory = True
+        self.game_active = False
+        
+        # Add to leaderboard
+        if self.leaderboard is not None:
+            self.leaderboard.add_entry(self.score, self.total_time_played, self.level)
+        
+        # Update high score
+        if self.score > self.high_score:
+            self.high_score = self.score
+            self.save_high_score()
+        
+        if self.on_victory:
+            self.on_victory()
+    
+    def step(self, input_vector, dt):
+        """
+        Advance the game by one tick
+        
+        Args:
+            input_vector: (x, y) movement input, each component in -1..1
+            dt: Time step in seconds
+        
+        Returns:
+            List of gems collected this tick
+        """
+        if not self.playing:
+            return []
+        
+        self.ticks += 1
+        self.total_time_played += dt
+        
+        profiler = self.profiler
+        
+        # Update timer
+        self.game_timer.update(dt)
+        profiler.mark('timer')
+        
+        # Update player and gems
+        if input_vector is None:
+            input_vector = (0, 0)
+        self.player.update(input_vector, dt)
+        profiler.mark('player')
+        self.gems.update(dt)
+        profiler.mark('gems')
+        
+        # Check for collisions between player and gems
+        collected = self.gem_grid.spritecollide(self.player)
+        for gem in collected:
+            # Increase score based on gem type
+            self.score += gem.value
+            self.gems_collected += 1
+            
+            # Add time bonus based on gem type
+            self.game_timer.add_time(TIME_BONUS.get(gem.gem_type, 1))
+            
+            if self.on_gem_collected:
+                self.on_gem_collected(gem)
+            self.gem_pool.release(gem)
+        
+        # Check if level is complete
+        if self.gems_collected >= self.gems_required:
+            if self.level < self.num_levels:
+                self.next_level()
+            else:
+                self.handle_victory()
+        profiler.mark('collisions')
+        
+        return collected
+
+# Run a headless session with a bot that walks to the nearest gem
+if __name__ == "__main__":
+    import os
+    import sys
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    
+    # Optional seed as the first argument
+    session = GameSession(seed=sys.argv[1] if len(sys.argv) > 1 else None)
+    session.start_game()
+    
+    def seek_nearest_gem():
+        px, py = session.player.rect.center
+        target = min(session.gems, default=None,
+                     key=lambda gem: (gem.rect.centerx - px) ** 2 + (gem.rect.centery - py) ** 2)
+        if target is None:
+            return (0, 0)
+        dx = target.rect.centerx - px
+        dy = target.rect.centery - py
+        return ((dx > 2) - (dx < -2), (dy > 2) - (dy < -2))
+    
+    start = time.perf_counter()
+    while session.playing and session.ticks < 100000:
+        session.step(seek_nearest_gem(), 1 / TICK_RATE)
+    elapsed = time.perf_counter() - start
+    
+    result = "victory" if session.victory else "game over"
+    print(f"{result}: level {session.level}, score {session.score}, "
+          f"{session.total_time_played:.1f}s of game time")
+    print(f"{session.ticks} ticks in {elapsed:.2f}s ({session.ticks / elapsed:.0f} ticks/s)")
+    pygame.quit()
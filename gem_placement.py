@@ -0,0 +1,125 @@
+import pygame
+import random
+import math
+
+# Blue-noise gem placement using Bridson's Poisson-disk sampling
+class GemPlacer:
+    def __init__(self, bounds, min_distance=60, keep_out=None, margin=20, seed=None, attempts=12, rng=None):
+        """
+        Initialize a gem placer
+        
+        Args:
+            bounds: Rect that gem centers are placed in
+            min_distance: Preferred minimum distance between gem centers
+            keep_out: Rects gems must never overlap (e.g. the HUD)
+            margin: Half the size of a gem; keep-out rects are grown by this
+            seed: Seed for reproducible placements
+            attempts: Candidates tried around each point before it is retired
+            rng: random.Random stream to draw from instead of one made from seed
+        """
+        self.bounds = pygame.Rect(bounds)
+        self.min_distance = min_distance
+        self.margin = margin
+        self.keep_out = [pygame.Rect(rect) for rect in keep_out or []]
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.attempts = attempts
+    
+    def place(self, count, keep_out=()):
+        """
+        Get `count` gem centers spaced at least min_distance apart
+        
+        keep_out adds rects to avoid for this call only (e.g. the player).
+        If the area can't fit `count` points at min_distance, the spacing is
+        reduced until it can.
+        """
+        if count <= 0:
+            return []
+        
+        blocked = [rect.inflate(self.margin * 2, self.margin * 2)
+                   for rect in self.keep_out + [pygame.Rect(rect) for rect in keep_out]]
+        
+        # A Poisson-disk set holds roughly 0.8 * area / r^2 points, so don't
+        # start from a spacing that can't possibly fit `count` gems
+        area = self.bounds.width * self.bounds.height
+        for rect in blocked:
+            overlap = rect.clip(self.bounds)
+            area -= overlap.width * overlap.height
+        area = max(area, 1)
+        distance = min(self.min_distance, math.sqrt(0.8 * area / count))
+        while True:
+            points = self.sample(distance, blocked)
+            if len(points) >= count or distance < 1:
+                break
+            distance *= 0.85
+        
+        # Take a random subset so the gems are spread over the whole area
+        self.rng.shuffle(points)
+        return points[:count]
+    
+    def sample(self, distance, blocked=()):
+        """Fill the bounds with Poisson-disk points at the given spacing"""
+        rng = self.rng
+        attempts = self.attempts
+        left, top = self.bounds.left, self.bounds.top
+        width, height = self.bounds.width, self.bounds.height
+        min_sq = distance * distance
+        
+        # Background grid with at most one point per cell, padded by two
+        # cells on every side so neighbour lookups need no bounds checks
+        cell_size = distance / math.sqrt(2)
+        cols = int(width / cell_size) + 5
+        rows = int(height / cell_size) + 5
+        grid = [None] * (cols * rows)
+        
+        # Only these cells around a candidate can hold a point closer than
+        # `distance`, so rejection is constant time
+        neighbours = [dy * cols + dx for dy in range(-2, 3) for dx in range(-2, 3)
+                      if abs(dx) + abs(dy) < 4]
+        
+        points = []
+        active = []
+        
+        def try_add(x, y):
+            if not (0 <= x < width and 0 <= y < height):
+                return False
+            cell = (int(y / cell_size) + 2) * cols + int(x / cell_size) + 2
+            for offset in neighbours:
+                other = grid[cell + offset]
+                if other is not None and (other[0] - x) ** 2 + (other[1] - y) ** 2 < min_sq:
+                    return False
+            for rect in blocked:
+                if rect.collidepoint(x + left, y + top):
+                    return False
+            grid[cell] = (x, y)
+            active.append((x, y))
+            points.append((x, y))
+            return True
+        
+        # Keep seeding until random probes stop finding room; keep-out zones
+        # can split the area into regions a single seed would never reach
+        misses = 0
+        while misses < attempts:
+            if not try_add(rng.uniform(0, width), rng.uniform(0, height)):
+                misses += 1
+                continue
+            misses = 0
+            
+            while active:
+                slot = rng.randrange(len(active))
+                px, py = active[slot]
+                
+                # Candidates just outside the exclusion radius at evenly
+                # stepped angles pack tightly with few attempts
+                angle = rng.uniform(0, 2 * math.pi)
+                step = 2 * math.pi / attempts
+                radius = distance * 1.0001
+                for _ in range(attempts):
+                    if try_add(px + radius * math.cos(angle), py + radius * math.sin(angle)):
+                        break
+                    angle += step
+                else:
+                    # No room left around this point
+                    active[slot] = active[-1]
+                    active.pop()
+        
+        return [(x + left, y + top) for x, y in points]
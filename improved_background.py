@@ -1,65 +1,166 @@
 import pygame
 import random
 import math
+import numpy as np
 
 class Cloud:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, rng=random):
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.rng = rng  # random.Random stream (or the random module)
         
+        # Cloud color (white with slight variations and reduced opacity)
+        self.base_color = (255, 255, 255)
+        
+        # Roll the cloud's properties and bake its texture
+        self.respawn()
+    
+    def respawn(self):
         # Cloud properties
-        self.x = random.randint(-200, -100)  # Start off-screen to the left
-        self.y = random.randint(20, int(screen_height * 0.4))
-        self.speed = random.uniform(0.05, 0.2)  # Reduced speed (was 0.2-0.8)
+        self.x = self.rng.randint(-200, -100)  # Start off-screen to the left
+        self.y = self.rng.randint(20, int(self.screen_height * 0.4))
+        self.speed = self.rng.uniform(0.05, 0.2)  # Reduced speed (was 0.2-0.8)
         
         # Cloud size and shape
-        self.width = random.randint(100, 200)
-        self.height = random.randint(40, 80)
-        self.segments = random.randint(3, 5)
+        self.width = self.rng.randint(100, 200)
+        self.height = self.rng.randint(40, 80)
+        self.segments = self.rng.randint(3, 5)
+        self.shape_seed = self.rng.getrandbits(32)
         
-        # Cloud color (white with slight variations and reduced opacity)
-        self.base_color = (255, 255, 255)
-        self.color_variation = random.randint(-20, 0)
+        self.color_variation = self.rng.randint(-20, 0)
         self.color = (
             max(0, min(255, self.base_color[0] + self.color_variation)),
             max(0, min(255, self.base_color[1] + self.color_variation)),
             max(0, min(255, self.base_color[2] + self.color_variation))
         )
-        self.opacity = random.randint(100, 180)  # Reduced opacity
-        
-    def update(self):
-        # Move cloud
-        self.x += self.speed
+        self.opacity = self.rng.randint(100, 180)  # Reduced opacity
         
-        # Reset if off-screen
-        if self.x > self.screen_width + 100:
-            self.x = random.randint(-200, -100)
-            self.y = random.randint(20, int(self.screen_height * 0.4))
-            self.speed = random.uniform(0.05, 0.2)  # Reduced speed
-            self.width = random.randint(100, 200)
-            self.height = random.randint(40, 80)
+        self.image = self.create_texture()
     
-    def draw(self, surface):
-        # Create a temporary surface for the cloud with alpha channel
+    def create_texture(self):
+        # Bake the cloud once so its shape stays stable between frames
         cloud_surface = pygame.Surface((self.width + 50, self.height + 50), pygame.SRCALPHA)
+        shape = random.Random(self.shape_seed)
         
         # Draw cloud as a series of overlapping circles with transparency
         for i in range(self.segments):
             segment_x = 25 + (i * self.width / self.segments)
-            segment_y = 25 + random.randint(-10, 10)
-            segment_radius = random.randint(int(self.height * 0.6), int(self.height * 0.8))
+            segment_y = 25 + shape.randint(-10, 10)
+            segment_radius = shape.randint(int(self.height * 0.6), int(self.height * 0.8))
             
             # Create color with opacity
             color_with_alpha = (*self.color, self.opacity)
             pygame.draw.circle(cloud_surface, color_with_alpha, (int(segment_x), int(segment_y)), segment_radius)
         
-        # Blit the cloud surface onto the main surface
-        surface.blit(cloud_surface, (int(self.x - 25), int(self.y - 25)))
+        return cloud_surface
+        
+    def update(self, dt=1/60):
+        # Move cloud (speed is per 1/60 s)
+        self.x += self.speed * dt * 60
+        
+        # Recycle the cloud once it drifts off-screen
+        if self.x > self.screen_width + 100:
+            self.respawn()
+    
+    def get_blit(self):
+        # Texture and position for batched drawing
+        return self.image, (int(self.x - 25), int(self.y - 25))
+    
+    def draw(self, surface):
+        surface.blit(*self.get_blit())
+
+class StarField:
+    def __init__(self, screen_width, screen_height, brightness_step=8, rng=random):
+        """
+        Star positions and twinkle parameters stored as NumPy arrays
+        
+        Args:
+            screen_width: Width of the sky
+            screen_height: Height of the screen (stars fill the top half)
+            brightness_step: Brightness is rounded to multiples of this so a
+                small set of pre-rendered star sprites covers every star
+            rng: random.Random stream stars are generated from
+        """
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.brightness_step = brightness_step
+        self.rng = rng
+        
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.radius = np.zeros(0, dtype=np.int32)
+        self.brightness = np.zeros(0, dtype=np.float64)
+        self.twinkle_speed = np.zeros(0, dtype=np.float64)
+        self.twinkle_phase = np.zeros(0, dtype=np.float64)
+        
+        # Pre-rendered star sprites keyed by (radius, brightness)
+        self.sprites = {}
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def generate(self, count):
+        x, y, radius, brightness, twinkle_speed, twinkle_phase = [], [], [], [], [], []
+        for _ in range(count):
+            x.append(self.rng.randint(0, self.screen_width))
+            y.append(self.rng.randint(0, self.screen_height // 2))
+            # Circles are drawn with whole-pixel radii
+            radius.append(int(self.rng.uniform(0.5, 2.5)))
+            brightness.append(self.rng.randint(100, 255))
+            twinkle_speed.append(self.rng.uniform(0.01, 0.05))
+            twinkle_phase.append(self.rng.uniform(0, 2 * math.pi))
+        
+        self.x = np.concatenate((self.x, x)).astype(np.int32)
+        self.y = np.concatenate((self.y, y)).astype(np.int32)
+        self.radius = np.concatenate((self.radius, radius)).astype(np.int32)
+        self.brightness = np.concatenate((self.brightness, brightness))
+        self.twinkle_speed = np.concatenate((self.twinkle_speed, twinkle_speed))
+        self.twinkle_phase = np.concatenate((self.twinkle_phase, twinkle_phase))
+    
+    def get_sprite(self, radius, brightness):
+        sprite = self.sprites.get((radius, brightness))
+        if sprite is None:
+            # Magenta is keyed out so dim stars still draw as dark dots
+            sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+            sprite.fill((255, 0, 255))
+            sprite.set_colorkey((255, 0, 255))
+            pygame.draw.circle(sprite, (brightness, brightness, brightness), (radius, radius), radius)
+            self.sprites[(radius, brightness)] = sprite
+        return sprite
+    
+    def get_blits(self, visibility, ticks):
+        """Get (sprite, (x, y)) for every star, in a fixed order"""
+        # Radius 0 stars draw nothing
+        visible = self.radius > 0
+        if not visible.any():
+            return []
+        radius = self.radius[visible]
+        
+        # Calculate current brightness with twinkle effect
+        twinkle = np.sin(self.twinkle_phase[visible] + ticks * self.twinkle_speed[visible])
+        brightness_factor = 0.7 + 0.3 * twinkle  # 0.7 to 1.0
+        
+        # Apply star visibility and round to the sprite brightness levels
+        step = self.brightness_step
+        brightness = (self.brightness[visible] * brightness_factor * visibility).astype(np.int32)
+        brightness = np.minimum((brightness + step // 2) // step * step, 255)
+        
+        # Look up one sprite per distinct (radius, brightness) pair
+        keys, sprite_index = np.unique(radius * 256 + brightness, return_inverse=True)
+        sprites = [self.get_sprite(key // 256, key % 256) for key in keys.tolist()]
+        
+        xs = (self.x[visible] - radius).tolist()
+        ys = (self.y[visible] - radius).tolist()
+        return [(sprites[i], (x, y)) for i, x, y in zip(sprite_index.tolist(), xs, ys)]
+    
+    def draw(self, surface, visibility, ticks):
+        surface.blits(self.get_blits(visibility, ticks), doreturn=False)
 
 class ParallaxBackground:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, rng=random):
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.rng = rng  # random.Random stream the scenery is generated from
         
         # Colors
         self.SKY_COLORS = {
@@ -79,62 +180,85 @@ class ParallaxBackground:
             (30, 60, 30)   # Light grass
         ]
         
+        # Tint applied to the mountain and ground palettes through the day
+        self.LAYER_TINTS = {
+            'dawn': (170, 140, 190),   # Muted purple
+            'day': (255, 255, 255),    # Untinted
+            'dusk': (230, 150, 120),   # Warm orange
+            'night': (90, 90, 140)     # Cold blue
+        }
+        self.NEXT_PERIOD = {'dawn': 'day', 'day': 'dusk', 'dusk': 'dawn', 'night': 'dawn'}
+        
+        # Number of shades between the two ground colors in the ground palette
+        self.GROUND_SHADES = 16
+        
         # Time of day
         self.time_of_day = 0  # 0 to 1, representing a full day cycle
         self.day_cycle_speed = 0.0002  # Speed of day/night cycle
-        self.current_sky_colors = self.get_sky_colors()
+        
+        # Sky colors precomputed over the day cycle; the sky layer is only
+        # rebuilt when time of day moves into a bucket with different colors
+        self.SKY_LUT_SIZE = 256
+        self.sky_lut = [self.get_sky_colors(i / self.SKY_LUT_SIZE) for i in range(self.SKY_LUT_SIZE)]
+        self.tint_lut = [self.get_layer_tint(sky_info) for sky_info in self.sky_lut]
+        self.sky_bucket = self.get_sky_bucket()
+        self.current_sky_colors = self.sky_lut[self.sky_bucket]
+        self.sky_version = 0
         
         # Stars
-        self.stars = []
+        self.stars = StarField(screen_width, screen_height, rng=rng)
         self.generate_stars(100)
         
+        # Clouds - a fixed pool recycled as they leave the screen
+        self.clouds = []
+        self.generate_clouds(3)
+        
         # Create layers
         self.layers = []
         self.create_layers()
+        self.apply_layer_tint()
         
         # Camera position for parallax effect
         self.camera_pos = [0, 0]
+        
+        # All layers flattened into one opaque surface, rebuilt only when a
+        # layer offset or the sky changes
+        self.composite = None
+        self.composite_key = None
+        self.layer_offsets = None
     
     def generate_stars(self, count):
-        for _ in range(count):
-            x = random.randint(0, self.screen_width)
-            y = random.randint(0, self.screen_height // 2)
-            size = random.uniform(0.5, 2.5)
-            brightness = random.randint(100, 255)
-            twinkle_speed = random.uniform(0.01, 0.05)
-            twinkle_phase = random.uniform(0, 2 * math.pi)
-            
-            self.stars.append({
-                'x': x,
-                'y': y,
-                'size': size,
-                'brightness': brightness,
-                'twinkle_speed': twinkle_speed,
-                'twinkle_phase': twinkle_phase
-            })
+        self.stars.generate(count)
     
     def generate_clouds(self, count):
         for _ in range(count):
-            self.clouds.append(Cloud(self.screen_width, self.screen_height))
+            self.clouds.append(Cloud(self.screen_width, self.screen_height, self.rng))
         
         # Add more clouds for a fuller sky
         for _ in range(count):
-            cloud = Cloud(self.screen_width, self.screen_height)
+            cloud = Cloud(self.screen_width, self.screen_height, self.rng)
             # Position these clouds further to the right so they don't all appear at once
-            cloud.x = random.randint(self.screen_width // 2, self.screen_width * 2)
+            cloud.x = self.rng.randint(self.screen_width // 2, self.screen_width * 2)
             self.clouds.append(cloud)
     
-    def get_sky_colors(self):
+    def get_sky_bucket(self):
+        # Index of the current time of day in the sky lookup table
+        return int(self.time_of_day * self.SKY_LUT_SIZE) % self.SKY_LUT_SIZE
+    
+    def get_sky_colors(self, time_of_day=None):
+        if time_of_day is None:
+            time_of_day = self.time_of_day
+        
         # Determine time of day period
-        if self.time_of_day < 0.25:  # Dawn: 0.0 - 0.25
+        if time_of_day < 0.25:  # Dawn: 0.0 - 0.25
             period = 'dawn'
-            t = self.time_of_day / 0.25
-        elif self.time_of_day < 0.75:  # Day: 0.25 - 0.75
+            t = time_of_day / 0.25
+        elif time_of_day < 0.75:  # Day: 0.25 - 0.75
             period = 'day'
-            t = (self.time_of_day - 0.25) / 0.5
-        elif self.time_of_day < 1.0:  # Dusk: 0.75 - 1.0
+            t = (time_of_day - 0.25) / 0.5
+        elif time_of_day < 1.0:  # Dusk: 0.75 - 1.0
             period = 'dusk'
-            t = (self.time_of_day - 0.75) / 0.25
+            t = (time_of_day - 0.75) / 0.25
         else:  # Night: 1.0 (wraps to 0.0)
             period = 'night'
             t = 0
@@ -145,56 +269,80 @@ class ParallaxBackground:
             'blend': t
         }
         
+    def get_layer_tint(self, sky_info):
+        # Blend from this period's tint towards the next period's
+        tint = self.LAYER_TINTS[sky_info['period']]
+        next_tint = self.LAYER_TINTS[self.NEXT_PERIOD[sky_info['period']]]
+        t = sky_info['blend']
+        return tuple(int(tint[i] * (1 - t) + next_tint[i] * t) for i in range(3))
+    
+    def apply_layer_tint(self):
+        # Re-tint the palettized layers by swapping their palettes
+        tint = self.tint_lut[self.sky_bucket]
+        for layer in self.layers:
+            if "palette" in layer:
+                layer["surface"].set_palette([
+                    (r * tint[0] // 255, g * tint[1] // 255, b * tint[2] // 255)
+                    for r, g, b in layer["palette"]
+                ])
+    
     def create_layers(self):
         # Sky layer (will be updated dynamically)
         sky_layer = self.create_sky_layer()
         self.layers.append({"surface": sky_layer, "speed": 0.0, "pos": [0, 0]})
         
         # Far mountains layer
-        mountains_far = self.create_mountain_layer(0, 0.1)
-        self.layers.append({"surface": mountains_far, "speed": 0.1, "pos": [0, 0]})
+        mountains_far, palette = self.create_mountain_layer(0, 0.1)
+        self.layers.append({"surface": mountains_far, "speed": 0.1, "pos": [0, 0], "palette": palette})
         
         # Mid mountains layer
-        mountains_mid = self.create_mountain_layer(1, 0.2)
-        self.layers.append({"surface": mountains_mid, "speed": 0.3, "pos": [0, 0]})
+        mountains_mid, palette = self.create_mountain_layer(1, 0.2)
+        self.layers.append({"surface": mountains_mid, "speed": 0.3, "pos": [0, 0], "palette": palette})
         
         # Near mountains layer
-        mountains_near = self.create_mountain_layer(2, 0.3)
-        self.layers.append({"surface": mountains_near, "speed": 0.5, "pos": [0, 0]})
+        mountains_near, palette = self.create_mountain_layer(2, 0.3)
+        self.layers.append({"surface": mountains_near, "speed": 0.5, "pos": [0, 0], "palette": palette})
         
         # Ground layer
-        ground_layer = self.create_ground_layer()
-        self.layers.append({"surface": ground_layer, "speed": 1.0, "pos": [0, 0]})
+        ground_layer, palette = self.create_ground_layer()
+        self.layers.append({"surface": ground_layer, "speed": 1.0, "pos": [0, 0], "palette": palette})
     
-    def create_sky_layer(self):
+    def create_sky_layer(self, layer=None):
         # Create a sky layer with gradient based on time of day
-        layer = pygame.Surface((self.screen_width, self.screen_height))
+        if layer is None:
+            layer = pygame.Surface((self.screen_width, self.screen_height))
         
         # Get current sky colors
         sky_info = self.current_sky_colors
         top_color = sky_info['colors'][0]
         bottom_color = sky_info['colors'][1]
-        blend = sky_info['blend']
         
-        # Draw gradient
+        # Draw the gradient into a 1 pixel wide column
+        column = pygame.Surface((1, self.screen_height))
         for y in range(self.screen_height):
             # Calculate color at this height
             t = y / self.screen_height
             r = int(top_color[0] * (1 - t) + bottom_color[0] * t)
             g = int(top_color[1] * (1 - t) + bottom_color[1] * t)
             b = int(top_color[2] * (1 - t) + bottom_color[2] * t)
-            color = (r, g, b)
-            
-            # Draw horizontal line with this color
-            pygame.draw.line(layer, color, (0, y), (self.screen_width, y))
+            column.set_at((0, y), (r, g, b))
         
-        return layer
+        # Stretch the column across the layer in a single scale blit
+        return pygame.transform.scale(column, (self.screen_width, self.screen_height), layer)
     
     def create_mountain_layer(self, color_index, height_factor):
-        # Create a layer with mountains
+        # Create a palettized layer with mountains. Pixels are palette indices:
+        # 0 is transparent, 1 the mountain color and 2 the highlight color.
         layer_width = self.screen_width * 2  # Make wider for scrolling
         layer_height = self.screen_height
-        layer = pygame.Surface((layer_width, layer_height), pygame.SRCALPHA)
+        layer = pygame.Surface((layer_width, layer_height), 0, 8)
+        
+        # Slightly lighter color for highlights
+        highlight_color = tuple(min(c + 20, 255) for c in self.MOUNTAIN_COLORS[color_index])
+        palette = [(0, 0, 0), self.MOUNTAIN_COLORS[color_index], highlight_color]
+        layer.set_palette(palette)
+        layer.fill(0)
+        layer.set_colorkey(0)
         
         # Generate mountain points
         num_points = 20
@@ -202,7 +350,7 @@ class ParallaxBackground:
         for i in range(num_points + 1):
             x = i * (layer_width / num_points)
             # Height varies based on position with some randomness
-            height = self.screen_height * (0.3 + height_factor * math.sin(i * 0.5) + random.uniform(0, 0.2))
+            height = self.screen_height * (0.3 + height_factor * math.sin(i * 0.5) + self.rng.uniform(0, 0.2))
             y = self.screen_height - height
             points.append((x, y))
         
@@ -211,71 +359,89 @@ class ParallaxBackground:
         points.append((0, layer_height))
         
         # Draw mountains
-        pygame.draw.polygon(layer, self.MOUNTAIN_COLORS[color_index], points)
+        pygame.draw.polygon(layer, 1, points)
         
         # Add some variation/detail
         for _ in range(10):
-            x1 = random.randint(0, layer_width)
-            y1 = random.randint(int(self.screen_height * 0.5), layer_height)
-            width = random.randint(50, 200)
-            height = random.randint(20, 100)
-            
-            # Slightly lighter color for highlights
-            highlight_color = tuple(min(c + 20, 255) for c in self.MOUNTAIN_COLORS[color_index])
+            x1 = self.rng.randint(0, layer_width)
+            y1 = self.rng.randint(int(self.screen_height * 0.5), layer_height)
+            width = self.rng.randint(50, 200)
+            height = self.rng.randint(20, 100)
             
-            pygame.draw.ellipse(layer, highlight_color, (x1, y1, width, height))
+            pygame.draw.ellipse(layer, 2, (x1, y1, width, height))
         
-        return layer
+        return layer, palette
     
     def create_ground_layer(self):
-        # Create a ground layer with grass pattern
+        # Create a palettized ground layer with grass pattern. Palette index 1
+        # is the dark grass, 2 the light grass, followed by the shades between.
         layer_width = self.screen_width * 2  # Make wider for scrolling
         layer_height = self.screen_height
-        layer = pygame.Surface((layer_width, layer_height), pygame.SRCALPHA)
+        layer = pygame.Surface((layer_width, layer_height), 0, 8)
+        
+        palette = [(0, 0, 0), self.GROUND_COLORS[0], self.GROUND_COLORS[1]]
+        for shade in range(self.GROUND_SHADES):
+            mix = shade / (self.GROUND_SHADES - 1)
+            palette.append(tuple(int(self.GROUND_COLORS[0][i] * (1-mix) + self.GROUND_COLORS[1][i] * mix) for i in range(3)))
+        layer.set_palette(palette)
         
         # Fill with base color
-        layer.fill(self.GROUND_COLORS[0])
+        layer.fill(1)
         
         # Add grass patches
         for _ in range(200):
-            x = random.randint(0, layer_width)
-            y = random.randint(int(self.screen_height * 0.7), layer_height)
-            size = random.randint(10, 50)
+            x = self.rng.randint(0, layer_width)
+            y = self.rng.randint(int(self.screen_height * 0.7), layer_height)
+            size = self.rng.randint(10, 50)
             
-            pygame.draw.circle(layer, self.GROUND_COLORS[1], (x, y), size)
+            pygame.draw.circle(layer, 2, (x, y), size)
         
         # Add some small details
         for _ in range(300):
-            x = random.randint(0, layer_width)
-            y = random.randint(int(self.screen_height * 0.7), layer_height)
-            size = random.randint(2, 8)
+            x = self.rng.randint(0, layer_width)
+            y = self.rng.randint(int(self.screen_height * 0.7), layer_height)
+            size = self.rng.randint(2, 8)
             
-            # Random color between the two ground colors
-            mix = random.random()
-            color = tuple(int(self.GROUND_COLORS[0][i] * (1-mix) + self.GROUND_COLORS[1][i] * mix) for i in range(3))
+            # Random shade between the two ground colors
+            mix = self.rng.random()
+            shade = 3 + round(mix * (self.GROUND_SHADES - 1))
             
-            pygame.draw.circle(layer, color, (x, y), size)
+            pygame.draw.circle(layer, shade, (x, y), size)
         
-        return layer
+        return layer, palette
     
-    def update(self, player_movement):
+    def update(self, player_movement, dt=1/60):
+        # Movement, drift and day cycle rates are per 1/60 s
+        steps = dt * 60
+        
         # Update camera position based on player movement
-        self.camera_pos[0] -= player_movement[0]
-        self.camera_pos[1] -= player_movement[1]
+        self.camera_pos[0] -= player_movement[0] * steps
+        self.camera_pos[1] -= player_movement[1] * steps
         
         # Update layer positions
         for layer in self.layers:
             layer["pos"][0] = (self.camera_pos[0] * layer["speed"]) % self.screen_width
             layer["pos"][1] = (self.camera_pos[1] * layer["speed"]) % self.screen_height
         
-        # Update time of day
-        self.time_of_day = (self.time_of_day + self.day_cycle_speed) % 1.0
-        self.current_sky_colors = self.get_sky_colors()
+        # Drift clouds
+        for cloud in self.clouds:
+            cloud.update(dt)
         
-        # Update sky layer
-        self.layers[0]["surface"] = self.create_sky_layer()
+        # Update time of day
+        self.time_of_day = (self.time_of_day + self.day_cycle_speed * steps) % 1.0
+        
+        # Update sky layer when time of day crosses into a new bucket
+        bucket = self.get_sky_bucket()
+        if bucket != self.sky_bucket:
+            self.sky_bucket = bucket
+            previous_colors = self.current_sky_colors['colors']
+            self.current_sky_colors = self.sky_lut[bucket]
+            if self.current_sky_colors['colors'] != previous_colors:
+                self.create_sky_layer(self.layers[0]["surface"])
+            self.apply_layer_tint()
+            self.sky_version += 1
     
-    def draw(self, surface):
+    def draw_layers(self, surface):
         # Draw all layers with parallax effect
         for layer in self.layers:
             # Draw the layer twice side by side for seamless scrolling
@@ -290,6 +456,38 @@ class ParallaxBackground:
                 surface.blit(layer["surface"], (x_pos - layer["surface"].get_width(), 0))
             elif x_pos < 0:
                 surface.blit(layer["surface"], (x_pos + layer["surface"].get_width(), 0))
+    
+    def get_composite(self):
+        """
+        Get every layer flattened into one surface, or None while scrolling
+        
+        The composite is rebuilt only once the layer offsets have held still
+        for a frame, so a moving camera doesn't pay for a rebuild every frame.
+        """
+        offsets = tuple(int(layer["pos"][0]) for layer in self.layers)
+        if offsets != self.layer_offsets:
+            self.layer_offsets = offsets
+            self.composite_key = None
+            return None
+        
+        key = (offsets, self.sky_version)
+        if key != self.composite_key:
+            if self.composite is None:
+                self.composite = pygame.Surface((self.screen_width, self.screen_height))
+                if pygame.display.get_surface() is not None:
+                    self.composite = self.composite.convert()
+            self.draw_layers(self.composite)
+            self.composite_key = key
+        return self.composite
+    
+    def bake(self):
+        """Build the composite for the current layer offsets ahead of the first draw"""
+        self.layer_offsets = tuple(int(layer["pos"][0]) for layer in self.layers)
+        return self.get_composite()
+    
+    def get_sky_blits(self):
+        """Get (image, (x, y)) for the stars and clouds drawn over the layers"""
+        blits = []
         
         # Draw stars if it's dusk or night
         period = self.current_sky_colors['period']
@@ -301,18 +499,22 @@ class ParallaxBackground:
             else:  # night
                 star_visibility = 1.0
                 
-            # Draw stars with twinkle effect
-            for star in self.stars:
-                # Calculate current brightness with twinkle effect
-                twinkle = math.sin(star['twinkle_phase'] + pygame.time.get_ticks() * star['twinkle_speed'])
-                brightness_factor = 0.7 + 0.3 * twinkle  # 0.7 to 1.0
-                
-                # Apply star visibility
-                final_brightness = int(star['brightness'] * brightness_factor * star_visibility)
-                star_color = (final_brightness, final_brightness, final_brightness)
-                
-                # Draw star
-                pygame.draw.circle(surface, star_color, (int(star['x']), int(star['y'])), star['size'])
+            # Stars with twinkle effect
+            blits.extend(self.stars.get_blits(star_visibility, pygame.time.get_ticks()))
+        
+        blits.extend(cloud.get_blit() for cloud in self.clouds)
+        return blits
+    
+    def draw(self, surface):
+        composite = self.get_composite()
+        if composite is None:
+            # Scrolling - blit the layers directly
+            self.draw_layers(surface)
+        else:
+            surface.blit(composite, (0, 0))
+        
+        # Draw stars and clouds in one batch
+        surface.blits(self.get_sky_blits(), doreturn=False)
 
 # Test the parallax background
 if __name__ == "__main__":
@@ -1,201 +1,600 @@
 import pygame
 import random
 import math
+import os
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Particle type codes used by the array backend
+PARTICLE_CIRCLE = 0
+PARTICLE_STAR = 1
+
+# Emitter priorities - higher priorities win when the particle budget runs out
+PRIORITY_TRAIL = 0
+PRIORITY_SPARKLE = 1
+PRIORITY_BURST = 2
+
+# Fixed-capacity struct-of-arrays particle pool
+class ParticleBuffer:
+    FIELDS = ('pos', 'velocity', 'size', 'alpha', 'lifespan', 'color', 'type', 'priority')
+    
+    def __init__(self, capacity=20000):
+        """
+        Preallocated NumPy storage for live particles
+        
+        Args:
+            capacity: Hard cap on the number of live particles
+        """
+        self.count = 0
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.alpha = np.zeros(capacity, dtype=np.float32)
+        self.lifespan = np.zeros(capacity, dtype=np.float32)  # In 1/60 s frames
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.type = np.zeros(capacity, dtype=np.uint8)
+        self.priority = np.zeros(capacity, dtype=np.uint8)
+    
+    def allocate(self, count, priority, limit=None):
+        """
+        Claim slots for up to `count` new particles
+        
+        Free slots are used while the pool holds fewer than `limit` particles.
+        Any shortfall is taken from lower-priority particles, those closest to
+        dying first. Returns the array of claimed slot indices, which may be
+        shorter than `count` when the budget is exhausted.
+        """
+        if limit is None:
+            limit = self.capacity
+        limit = min(limit, self.capacity)
+        
+        # Find eviction candidates before the new slots are appended
+        shortfall = count - max(0, min(count, limit - self.count))
+        victims = None
+        if shortfall > 0:
+            victims = np.flatnonzero(self.priority[:self.count] < priority)
+            if len(victims) > shortfall:
+                order = np.lexsort((self.lifespan[victims], self.priority[victims]))
+                victims = victims[order[:shortfall]]
+        
+        # Append into free slots
+        free = count - shortfall
+        slots = np.arange(self.count, self.count + free)
+        self.count += free
+        
+        if victims is not None and len(victims) > 0:
+            slots = np.concatenate((slots, victims))
+        return slots
+    
+    def spawn(self, slots, pos, velocity, size, color, alpha, lifespan, particle_type, priority):
+        """Write a batch of particles into slots claimed with allocate()"""
+        self.pos[slots] = pos
+        self.velocity[slots] = velocity
+        self.size[slots] = size
+        self.color[slots] = color
+        self.alpha[slots] = alpha
+        self.lifespan[slots] = lifespan
+        self.type[slots] = particle_type
+        self.priority[slots] = priority
+    
+    def update(self, dt=1/60):
+        """Advance all particles by dt seconds and compact dead slots"""
+        n = self.count
+        if n == 0:
+            return
+        steps = dt * 60  # Velocities, lifespans and fade rates are per 1/60 s
+        
+        # Move particles
+        self.pos[:n] += self.velocity[:n] * steps
+        
+        # Decrease lifespan
+        lifespan = self.lifespan[:n]
+        lifespan -= steps
+        
+        # Fade out
+        fading = lifespan < 10
+        self.alpha[:n][fading] *= 0.9 ** steps
+        
+        # Remove dead particles in a single pass
+        alive = lifespan > 0
+        live_count = int(np.count_nonzero(alive))
+        if live_count < n:
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                array[:live_count] = array[:n][alive]
+            self.count = live_count
+    
+    def clear(self):
+        """Remove all particles without releasing the arrays"""
+        self.count = 0
+
+# Unit star outline, alternating outer and inner points
+STAR_OUTLINE = []
+for _i in range(5):
+    _angle = 2 * math.pi * _i / 5 - math.pi / 2
+    STAR_OUTLINE.append((math.cos(_angle), math.sin(_angle)))
+    _angle += math.pi / 5
+    STAR_OUTLINE.append((0.4 * math.cos(_angle), 0.4 * math.sin(_angle)))
+
+# Pre-rendered particle sprites shared by every particle with the same look
+class ParticleSpriteCache:
+    def __init__(self, max_sprites=512, alpha_step=8):
+        """
+        Initialize the sprite cache
+        
+        Args:
+            max_sprites: Number of sprites kept before the least recently used is evicted
+            alpha_step: Alpha values are rounded to multiples of this step
+        """
+        self.max_sprites = max_sprites
+        self.alpha_step = alpha_step
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def quantize_alpha(self, alpha):
+        """Round an array of alpha values to the cache's alpha step"""
+        step = self.alpha_step
+        quantized = (alpha.astype(np.int64) + step // 2) // step * step
+        return np.minimum(quantized, 255)
+    
+    def get(self, particle_type, size, color, alpha):
+        """Return the sprite for a particle, rendering it on a cache miss"""
+        key = (particle_type, size, color, alpha)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+        
+        self.misses += 1
+        sprite = self.render_sprite(particle_type, size, color, alpha)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+    
+    def render_sprite(self, particle_type, size, color, alpha):
+        """Render a single particle sprite"""
+        sprite = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+        color_with_alpha = (*color, alpha)
+        
+        if particle_type == PARTICLE_CIRCLE:
+            pygame.draw.circle(sprite, color_with_alpha, (size, size), size)
+        elif particle_type == PARTICLE_STAR:
+            points = [(size + size * x, size + size * y) for x, y in STAR_OUTLINE]
+            pygame.draw.polygon(sprite, color_with_alpha, points)
+        
+        return sprite
+    
+    def clear(self):
+        """Drop all cached sprites and reset the counters"""
+        self.sprites.clear()
+        self.hits = 0
+        self.misses = 0
 
 # Enhanced particle effects
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
+    def __init__(self, max_particles=20000, budget_shares=None, rng=None):
+        """
+        Initialize the particle system
+        
+        Args:
+            max_particles: Hard cap on live particles across all effects
+            budget_shares: Fraction of max_particles each priority may fill.
+                Emitters are trimmed once the pool passes their share, so trails
+                thin out first, then sparkles, while bursts can still evict both.
+            rng: random.Random stream the NumPy generator is seeded from
+                (unseeded if None)
+        """
+        self.max_particles = max_particles
+        self.budget_shares = budget_shares or {
+            PRIORITY_TRAIL: 0.5,
+            PRIORITY_SPARKLE: 0.8,
+            PRIORITY_BURST: 1.0
+        }
+        self.particles = ParticleBuffer(max_particles)
+        self.sprite_cache = ParticleSpriteCache()
+        self.rng = np.random.default_rng(None if rng is None else rng.getrandbits(64))
+        
+        # Particles that were requested but not spawned because of the budget
+        self.dropped = 0
+    
+    def __len__(self):
+        return self.particles.count
+    
+    def can_emit(self, priority):
+        """Check whether an emitter of this priority still has budget"""
+        return self.particles.count < self.max_particles * self.budget_shares[priority]
+    
+    def allocate(self, count, priority):
+        """Claim particle slots for an emitter, respecting the budget"""
+        limit = int(self.max_particles * self.budget_shares[priority])
+        slots = self.particles.allocate(count, priority, limit)
+        self.dropped += count - len(slots)
+        return slots
     
     def create_collection_effect(self, x, y, color, count=20):
         """Create particles for gem collection effect"""
-        for _ in range(count):
-            # Random velocity
-            speed = random.uniform(1, 5)
-            angle = random.uniform(0, 2 * math.pi)
-            velocity = [speed * math.cos(angle), speed * math.sin(angle)]
-            
-            # Random size
-            size = random.uniform(2, 6)
-            
-            # Random lifespan
-            lifespan = random.randint(20, 60)
-            
-            # Create particle
-            particle = {
-                'pos': [x, y],
-                'velocity': velocity,
-                'size': size,
-                'color': color,
-                'alpha': 255,
-                'lifespan': lifespan,
-                'type': 'circle'
-            }
-            self.particles.append(particle)
+        slots = self.allocate(count, PRIORITY_BURST)
+        count = len(slots)
+        if count == 0:
+            return
+        
+        # Random velocity
+        speed = self.rng.uniform(1, 5, count)
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        velocity = np.column_stack((speed * np.cos(angle), speed * np.sin(angle)))
+        
+        # Random size
+        size = self.rng.uniform(2, 6, count)
+        
+        # Random lifespan
+        lifespan = self.rng.integers(20, 61, count)
+        
+        self.particles.spawn(slots, (x, y), velocity, size, color, 255, lifespan,
+                             PARTICLE_CIRCLE, PRIORITY_BURST)
     
     def create_trail_effect(self, x, y, color, count=1):
         """Create trail particles that follow the player"""
-        for _ in range(count):
-            # Small random offset
-            offset_x = random.uniform(-5, 5)
-            offset_y = random.uniform(-5, 5)
-            
-            # Slow downward velocity
-            velocity = [random.uniform(-0.2, 0.2), random.uniform(0.1, 0.5)]
-            
-            # Random size
-            size = random.uniform(1, 3)
-            
-            # Short lifespan
-            lifespan = random.randint(10, 30)
-            
-            # Create particle
-            particle = {
-                'pos': [x + offset_x, y + offset_y],
-                'velocity': velocity,
-                'size': size,
-                'color': color,
-                'alpha': 150,
-                'lifespan': lifespan,
-                'type': 'circle'
-            }
-            self.particles.append(particle)
+        slots = self.allocate(count, PRIORITY_TRAIL)
+        count = len(slots)
+        if count == 0:
+            return
+        
+        # Small random offset
+        pos = np.column_stack((x + self.rng.uniform(-5, 5, count),
+                               y + self.rng.uniform(-5, 5, count)))
+        
+        # Slow downward velocity
+        velocity = np.column_stack((self.rng.uniform(-0.2, 0.2, count),
+                                    self.rng.uniform(0.1, 0.5, count)))
+        
+        # Random size
+        size = self.rng.uniform(1, 3, count)
+        
+        # Short lifespan
+        lifespan = self.rng.integers(10, 31, count)
+        
+        self.particles.spawn(slots, pos, velocity, size, color, 150, lifespan,
+                             PARTICLE_CIRCLE, PRIORITY_TRAIL)
     
     def create_sparkle_effect(self, x, y, color, count=1):
         """Create sparkle particles for gems"""
-        for _ in range(count):
-            # Random position near the gem
-            pos_x = x + random.uniform(-10, 10)
-            pos_y = y + random.uniform(-10, 10)
-            
-            # No velocity
-            velocity = [0, 0]
-            
-            # Random size
-            size = random.uniform(1, 3)
-            
-            # Short lifespan
-            lifespan = random.randint(5, 15)
-            
-            # Create particle
-            particle = {
-                'pos': [pos_x, pos_y],
-                'velocity': velocity,
-                'size': size,
-                'color': (255, 255, 255),  # White sparkles
-                'alpha': 200,
-                'lifespan': lifespan,
-                'type': 'star'
-            }
-            self.particles.append(particle)
-    
-    def update(self):
+        slots = self.allocate(count, PRIORITY_SPARKLE)
+        count = len(slots)
+        if count == 0:
+            return
+        
+        # Random position near the gem
+        pos = np.column_stack((x + self.rng.uniform(-10, 10, count),
+                               y + self.rng.uniform(-10, 10, count)))
+        
+        # Random size
+        size = self.rng.uniform(1, 3, count)
+        
+        # Short lifespan
+        lifespan = self.rng.integers(5, 16, count)
+        
+        # No velocity, white sparkles
+        self.particles.spawn(slots, pos, 0, size, (255, 255, 255), 200, lifespan,
+                             PARTICLE_STAR, PRIORITY_SPARKLE)
+    
+    def update(self, dt=1/60):
         """Update all particles"""
-        # Update each particle
-        for particle in self.particles[:]:
-            # Move particle
-            particle['pos'][0] += particle['velocity'][0]
-            particle['pos'][1] += particle['velocity'][1]
-            
-            # Decrease lifespan
-            particle['lifespan'] -= 1
-            
-            # Fade out
-            if particle['lifespan'] < 10:
-                particle['alpha'] = int(particle['alpha'] * 0.9)
-            
-            # Remove if dead
-            if particle['lifespan'] <= 0:
-                self.particles.remove(particle)
+        self.particles.update(dt)
     
     def draw(self, surface):
         """Draw all particles"""
-        for particle in self.particles:
-            # Get particle properties
-            x, y = int(particle['pos'][0]), int(particle['pos'][1])
-            size = int(particle['size'])
-            color = particle['color']
-            alpha = particle['alpha']
-            
-            # Create a surface for the particle
-            particle_surface = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
-            
-            # Draw based on type
-            if particle['type'] == 'circle':
-                # Apply alpha to color
-                color_with_alpha = (*color, alpha)
-                pygame.draw.circle(particle_surface, color_with_alpha, (size, size), size)
-            elif particle['type'] == 'star':
-                # Draw a star shape
-                color_with_alpha = (255, 255, 255, alpha)
-                points = []
-                for i in range(5):
-                    # Outer points
-                    angle = 2 * math.pi * i / 5 - math.pi / 2
-                    points.append((
-                        size + size * math.cos(angle),
-                        size + size * math.sin(angle)
-                    ))
-                    # Inner points
-                    angle += math.pi / 5
-                    points.append((
-                        size + size * 0.4 * math.cos(angle),
-                        size + size * 0.4 * math.sin(angle)
-                    ))
-                pygame.draw.polygon(particle_surface, color_with_alpha, points)
-            
-            # Draw the particle
-            surface.blit(particle_surface, (x - size, y - size))
+        buffer = self.particles
+        n = buffer.count
+        if n == 0:
+            return
+        
+        sizes = buffer.size[:n].astype(np.int64)
+        types = buffer.type[:n].astype(np.int64)
+        alphas = self.sprite_cache.quantize_alpha(buffer.alpha[:n])
+        
+        # Stars are always drawn white
+        colors = buffer.color[:n].astype(np.int64)
+        colors[types == PARTICLE_STAR] = 255
+        
+        # Pack each particle's sprite key into one integer so the distinct
+        # sprites for this frame can be found with a single np.unique call
+        keys = ((types << 40) | (sizes << 32) | (colors[:, 0] << 24) |
+                (colors[:, 1] << 16) | (colors[:, 2] << 8) | alphas)
+        unique_keys, sprite_index = np.unique(keys, return_inverse=True)
+        sprites = [
+            self.sprite_cache.get(key >> 40, (key >> 32) & 0xFF,
+                                  ((key >> 24) & 0xFF, (key >> 16) & 0xFF, (key >> 8) & 0xFF),
+                                  key & 0xFF)
+            for key in unique_keys.tolist()
+        ]
+        
+        # Sprites are centred on the particle position
+        pos = buffer.pos[:n].astype(np.int32)
+        xs = (pos[:, 0] - sizes).tolist()
+        ys = (pos[:, 1] - sizes).tolist()
+        
+        surface.blits([(sprites[i], (x, y)) for i, x, y in zip(sprite_index.tolist(), xs, ys)],
+                      doreturn=False)
+    
+    def get_dirty_rects(self, tile_size=64):
+        """
+        Get rects covering everything draw() would touch
+        
+        Particles are snapped to a grid of tile_size tiles and each run of
+        covered tiles in a row becomes one rect, which stays cheap with
+        thousands of particles at the cost of some overdraw.
+        """
+        buffer = self.particles
+        n = buffer.count
+        if n == 0:
+            return []
+        
+        sizes = buffer.size[:n].astype(np.int64)
+        pos = buffer.pos[:n].astype(np.int32).astype(np.int64)
+        left = (pos[:, 0] - sizes) // tile_size
+        right = (pos[:, 0] + sizes) // tile_size
+        top = (pos[:, 1] - sizes) // tile_size
+        bottom = (pos[:, 1] + sizes) // tile_size
+        
+        # Particles are much smaller than a tile, so their corners cover
+        # every tile they touch. Tiles are packed as row * 2^20 + column (offset to
+        # stay positive) so they can be deduplicated and sorted in one go
+        offset = 1 << 19
+        tiles = np.unique(np.concatenate([
+            (row + offset) * (1 << 20) + column + offset
+            for row in (top, bottom) for column in (left, right)
+        ]))
+        
+        rects = []
+        run_start = previous = None
+        for tile in tiles.tolist():
+            if previous is None or tile != previous + 1:
+                if run_start is not None:
+                    rects.append(self.tile_run_rect(run_start, previous, tile_size, offset))
+                run_start = tile
+            previous = tile
+        rects.append(self.tile_run_rect(run_start, previous, tile_size, offset))
+        return rects
+    
+    @staticmethod
+    def tile_run_rect(first, last, tile_size, offset):
+        """Get the screen rect of a run of packed tiles in one row"""
+        row = (first >> 20) - offset
+        column = (first & ((1 << 20) - 1)) - offset
+        return pygame.Rect(column * tile_size, row * tile_size, (last - first + 1) * tile_size, tile_size)
 
 # Light effect for gems and UI
 class LightEffect:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, lightmap_scale=1.0, accumulator='blit', workers=None):
+        """
+        Initialize the light effect
+        
+        Args:
+            screen_width: Width of the rendered light surface
+            screen_height: Height of the rendered light surface
+            lightmap_scale: Resolution of the light map relative to the screen
+                (e.g. 0.5 or 0.25). Lighting is low-frequency, so it can be
+                accumulated small and smoothly upscaled once per frame.
+            accumulator: 'blit' composites lights with additive blits,
+                'numpy' sums them in NumPy over horizontal bands on a thread pool
+            workers: Number of bands/threads for the 'numpy' accumulator
+                (defaults to the CPU count)
+        """
+        if accumulator not in ('blit', 'numpy'):
+            raise ValueError(f"Unknown light accumulator: {accumulator}")
+        
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.lights = []
+        self.lightmap_scale = lightmap_scale
+        self.accumulator = accumulator
+        self.workers = workers or os.cpu_count() or 1
+        
+        # Lights keyed by the handle returned from add_light
+        self.lights = {}
+        self.next_handle = 0
+        
+        # Gradient textures keyed by (radius, color, intensity)
+        self.light_textures = {}
+        
+        # Persistent light map, black where there is no light
+        self.light_surface = pygame.Surface((screen_width, screen_height))
+        if lightmap_scale == 1.0:
+            self.light_map = self.light_surface
+        else:
+            self.light_map = pygame.Surface((max(1, math.ceil(screen_width * lightmap_scale)),
+                                             max(1, math.ceil(screen_height * lightmap_scale))))
+        
+        # State for the NumPy accumulator, created on first use
+        self.light_arrays = {}
+        self.accum = None
+        self.executor = None
     
-    def add_light(self, x, y, radius, color, intensity=0.5):
-        """Add a light source"""
-        self.lights.append({
+    def add_light(self, x, y, radius, color, intensity=0.5, sprite=None):
+        """
+        Add a light source and return its handle
+        
+        If a sprite is given, the light follows sprite.rect.center at render
+        time and x, y are only used until then.
+        """
+        handle = self.next_handle
+        self.next_handle += 1
+        self.lights[handle] = {
             'pos': [x, y],
             'radius': radius,
             'color': color,
-            'intensity': intensity
-        })
+            'intensity': intensity,
+            'sprite': sprite
+        }
+        return handle
     
-    def update_light(self, index, x, y):
+    def update_light(self, handle, x, y):
         """Update light position"""
-        if 0 <= index < len(self.lights):
-            self.lights[index]['pos'] = [x, y]
+        light = self.lights.get(handle)
+        if light is not None:
+            light['pos'] = [x, y]
     
-    def remove_light(self, index):
+    def remove_light(self, handle):
         """Remove a light"""
-        if 0 <= index < len(self.lights):
-            self.lights.pop(index)
+        self.lights.pop(handle, None)
     
     def clear_lights(self):
         """Remove all lights"""
-        self.lights = []
+        self.lights = {}
+    
+    def get_light_texture(self, radius, color, intensity):
+        """Get the gradient texture for a light, building it on first use"""
+        key = (int(radius), tuple(color), intensity)
+        texture = self.light_textures.get(key)
+        if texture is None:
+            texture = self.create_light_texture(*key)
+            self.light_textures[key] = texture
+        return texture
+    
+    def create_light_texture(self, radius, color, intensity):
+        """Build a radial gradient texture for additive blending"""
+        texture = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+        
+        # Additive blits ignore per-pixel alpha, so the gradient is
+        # premultiplied into the color instead of stored in an alpha channel
+        for r in range(radius, 0, -1):
+            alpha = (1 - r / radius) * intensity
+            color_with_alpha = tuple(int(c * alpha) for c in color)
+            pygame.draw.circle(texture, color_with_alpha, (radius, radius), r)
+        
+        return texture
+    
+    def get_light_array(self, radius, color, intensity):
+        """Get a light's gradient as a (width, height, 3) array for NumPy accumulation"""
+        key = (int(radius), tuple(color), intensity)
+        array = self.light_arrays.get(key)
+        if array is None:
+            texture = self.get_light_texture(radius, color, intensity)
+            array = pygame.surfarray.array3d(texture)
+            self.light_arrays[key] = array
+        return array
+    
+    def preload_light(self, radius, color, intensity):
+        """Build what render() needs for a light of this look before it's added"""
+        radius = int(radius * self.lightmap_scale)
+        if self.accumulator == 'numpy':
+            self.get_light_array(radius, color, intensity)
+        else:
+            self.get_light_texture(radius, color, intensity)
+    
+    def get_light_blits(self):
+        """
+        Get (handle, texture, (x, y)) for every light at full resolution
+        
+        Additive blits saturate the same one light at a time as through the
+        light map, so callers can composite the lights themselves.
+        """
+        blits = []
+        for handle, light in self.lights.items():
+            sprite = light['sprite']
+            if sprite is not None:
+                x, y = sprite.rect.center
+            else:
+                x, y = light['pos']
+            radius = int(light['radius'])
+            texture = self.get_light_texture(radius, light['color'], light['intensity'])
+            blits.append((handle, texture, (int(x) - radius, int(y) - radius)))
+        return blits
     
     def render(self):
         """Render the light effect"""
-        # Create a surface for the light overlay
-        light_surface = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-        
-        # Draw each light
-        for light in self.lights:
-            x, y = light['pos']
-            radius = light['radius']
-            color = light['color']
-            intensity = light['intensity']
-            
-            # Create a radial gradient
-            for r in range(int(radius), 0, -1):
-                alpha = int(255 * (1 - r / radius) * intensity)
-                color_with_alpha = (*color, alpha)
-                pygame.draw.circle(light_surface, color_with_alpha, (int(x), int(y)), r)
+        scale = self.lightmap_scale
+        
+        # Resolve light positions and sizes in light map space
+        placed = []
+        for light in self.lights.values():
+            sprite = light['sprite']
+            if sprite is not None:
+                x, y = sprite.rect.center
+            else:
+                x, y = light['pos']
+            radius = int(light['radius'] * scale)
+            placed.append((radius, light['color'], light['intensity'],
+                           int(x * scale) - radius, int(y * scale) - radius))
+        
+        if self.accumulator == 'numpy':
+            self.accumulate_numpy(placed)
+        else:
+            # Reuse the light map instead of allocating one per frame and
+            # composite each light with one additive blit
+            self.light_map.fill((0, 0, 0))
+            blits = [(self.get_light_texture(radius, color, intensity), (x, y), None, pygame.BLEND_RGB_ADD)
+                     for radius, color, intensity, x, y in placed]
+            self.light_map.blits(blits, doreturn=False)
+        
+        # Upscale the reduced light map to screen size
+        if self.light_map is not self.light_surface:
+            pygame.transform.smoothscale(self.light_map, (self.screen_width, self.screen_height),
+                                         self.light_surface)
+        
+        return self.light_surface
+    
+    def accumulate_numpy(self, placed):
+        """Sum lights into the light map in parallel horizontal bands"""
+        width, height = self.light_map.get_size()
+        if self.accum is None:
+            # 32 bits so thousands of overlapping lights saturate rather than wrap
+            self.accum = np.zeros((width, height, 3), dtype=np.uint32)
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
         
-        return light_surface
+        # Assign each light to the bands it overlaps
+        band_height = math.ceil(height / self.workers)
+        bands = [[] for _ in range(self.workers)]
+        for radius, color, intensity, x, y in placed:
+            array = self.get_light_array(radius, color, intensity)
+            top = max(y, 0)
+            bottom = min(y + array.shape[1], height)
+            if top >= bottom or x >= width or x + array.shape[0] <= 0:
+                continue
+            for band in range(top // band_height, (bottom - 1) // band_height + 1):
+                bands[band].append((array, x, y))
+        
+        # NumPy releases the GIL, so bands are summed on separate cores and
+        # written straight into the surface's pixels
+        pixels = pygame.surfarray.pixels3d(self.light_map)
+        try:
+            jobs = [self.executor.submit(self.accumulate_band, pixels, band * band_height,
+                                         min((band + 1) * band_height, height), lights)
+                    for band, lights in enumerate(bands)]
+            for job in jobs:
+                job.result()
+        finally:
+            del pixels
+    
+    def accumulate_band(self, pixels, top, bottom, lights):
+        """Sum the lights overlapping rows top..bottom and store them in pixels"""
+        if top >= bottom:
+            return
+        width = pixels.shape[0]
+        accum = self.accum[:, top:bottom]
+        accum.fill(0)
+        
+        for array, x, y in lights:
+            # Clip the light's texture to this band and the light map
+            x0 = max(x, 0)
+            x1 = min(x + array.shape[0], width)
+            y0 = max(y, top)
+            y1 = min(y + array.shape[1], bottom)
+            accum[x0:x1, y0 - top:y1 - top] += array[x0 - x:x1 - x, y0 - y:y1 - y]
+        
+        np.minimum(accum, 255, out=accum)
+        pixels[:, top:bottom] = accum
+    
+    def close(self):
+        """Shut down the accumulator's worker threads"""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            self.accum = None
 
 # Screen transition effects
 class ScreenTransition:
@@ -218,21 +617,21 @@ class ScreenTransition:
         self.speed = speed
         self.callback = callback
     
-    def update(self):
-        """Update the transition progress"""
+    def update(self, dt=1/60):
+        """Update the transition progress (speed is per 1/60 s)"""
         if not self.active:
             return
         
         # Update progress
         if self.direction == 'in':
-            self.progress += self.speed
+            self.progress += self.speed * dt * 60
             if self.progress >= 1:
                 self.progress = 1
                 self.active = False
                 if self.callback:
                     self.callback()
         else:  # 'out'
-            self.progress -= self.speed
+            self.progress -= self.speed * dt * 60
             if self.progress <= 0:
                 self.progress = 0
                 self.active = False
@@ -288,7 +687,7 @@ if __name__ == "__main__":
     transition = ScreenTransition(screen_width, screen_height)
     
     # Add some lights
-    lights.add_light(200, 300, 100, (255, 0, 0), 0.3)
+    mouse_light = lights.add_light(200, 300, 100, (255, 0, 0), 0.3)
     lights.add_light(400, 200, 150, (0, 255, 0), 0.3)
     lights.add_light(600, 400, 120, (0, 0, 255), 0.3)
     
@@ -345,8 +744,7 @@ if __name__ == "__main__":
         transition.update()
         
         # Move the first light to follow the mouse
-        if len(lights.lights) > 0:
-            lights.update_light(0, mouse_pos[0], mouse_pos[1])
+        lights.update_light(mouse_light, mouse_pos[0], mouse_pos[1])
         
         # Draw
         screen.fill((20, 20, 30))
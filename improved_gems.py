@@ -1,101 +1,87 @@
 import pygame
 import math
 import random
+import numpy as np
 
-# Improved Gem class with better graphics and animations
-class ImprovedGem(pygame.sprite.Sprite):
-    def __init__(self, gem_type=None, x=None, y=None):
-        super().__init__()
-        
-        # Gem types and colors
-        self.gem_types = ["diamond", "ruby", "emerald", "sapphire", "topaz"]
-        self.colors = {
-            "diamond": (200, 255, 255),  # Cyan
-            "ruby": (255, 50, 50),       # Red
-            "emerald": (50, 255, 80),    # Green
-            "sapphire": (50, 100, 255),  # Blue
-            "topaz": (255, 255, 50)      # Yellow
-        }
-        self.glow_colors = {
-            "diamond": (220, 255, 255),  # Lighter cyan
-            "ruby": (255, 150, 150),     # Lighter red
-            "emerald": (150, 255, 150),  # Lighter green
-            "sapphire": (150, 200, 255), # Lighter blue
-            "topaz": (255, 255, 150)     # Lighter yellow
-        }
-        
-        # Select gem type
-        if gem_type is None:
-            self.gem_type = random.choice(self.gem_types)
-        else:
-            self.gem_type = gem_type
-            
-        self.color = self.colors[self.gem_type]
-        self.glow_color = self.glow_colors[self.gem_type]
-        
-        # Create animation frames
-        self.frames = []
-        self.create_animation_frames()
-        
-        # Animation variables
-        self.frame_index = 0
-        self.animation_speed = 0.1
-        self.animation_timer = 0
-        
-        # Set initial image and position
-        self.image = self.frames[0]
-        self.rect = self.image.get_rect()
-        
-        # Position the gem
-        if x is None or y is None:
-            self.rect.x = random.randint(50, 750)  # Assuming screen width is 800
-            self.rect.y = random.randint(50, 550)  # Assuming screen height is 600
-        else:
-            self.rect.x = x
-            self.rect.y = y
-            
-        # Store original position for bobbing animation
-        self.original_y = self.rect.y
-        self.bob_offset = random.uniform(0, 2 * math.pi)  # Random start phase
-        self.bob_speed = random.uniform(0.05, 0.1)
-        self.bob_height = random.uniform(3, 6)
-        
-        # Value of the gem
-        self.value = self.get_value()
+# Gem types and colors
+GEM_TYPES = ["diamond", "ruby", "emerald", "sapphire", "topaz"]
+GEM_COLORS = {
+    "diamond": (200, 255, 255),  # Cyan
+    "ruby": (255, 50, 50),       # Red
+    "emerald": (50, 255, 80),    # Green
+    "sapphire": (50, 100, 255),  # Blue
+    "topaz": (255, 255, 50)      # Yellow
+}
+GEM_GLOW_COLORS = {
+    "diamond": (220, 255, 255),  # Lighter cyan
+    "ruby": (255, 150, 150),     # Lighter red
+    "emerald": (150, 255, 150),  # Lighter green
+    "sapphire": (150, 200, 255), # Lighter blue
+    "topaz": (255, 255, 150)     # Lighter yellow
+}
+
+# Process-wide store of gem animation frames. Each gem type gets a bounded
+# number of seeded shape variants, baked once and shared by every gem.
+class GemAtlas:
+    def __init__(self, variants_per_type=4, num_frames=8):
+        self.variants_per_type = variants_per_type
+        self.num_frames = num_frames
+        self.frames = {}
+    
+    def get_frames(self, gem_type, variant):
+        """Get the frames for a gem type and shape variant, baking them on first use"""
+        key = (gem_type, variant % self.variants_per_type)
+        frames = self.frames.get(key)
+        if frames is None:
+            frames = self.create_animation_frames(*key)
+            self.frames[key] = frames
+        return frames
+    
+    def preload(self, gem_types=GEM_TYPES):
+        """Bake every variant of the given gem types (all by default) up front"""
+        for gem_type in gem_types:
+            for variant in range(self.variants_per_type):
+                self.get_frames(gem_type, variant)
+    
+    def create_animation_frames(self, gem_type, variant):
+        # Seed the shape jitter so a variant always looks the same
+        shape = random.Random(f"{gem_type}:{variant}")
+        color = GEM_COLORS[gem_type]
+        glow_color = GEM_GLOW_COLORS[gem_type]
         
-    def create_animation_frames(self):
         # Create frames for gem animation (rotation effect)
-        num_frames = 8
-        
-        for i in range(num_frames):
+        frames = []
+        for i in range(self.num_frames):
             # Calculate rotation factor (0 to 1)
-            rotation = i / num_frames
+            rotation = i / self.num_frames
             
             # Create frame
             frame = pygame.Surface((40, 40), pygame.SRCALPHA)
             
             # Draw gem based on type and rotation
-            if self.gem_type == "diamond":
-                self.draw_diamond(frame, rotation)
-            elif self.gem_type == "ruby":
-                self.draw_ruby(frame, rotation)
-            elif self.gem_type == "emerald":
-                self.draw_emerald(frame, rotation)
-            elif self.gem_type == "sapphire":
-                self.draw_sapphire(frame, rotation)
+            if gem_type == "diamond":
+                self.draw_diamond(frame, rotation, color, glow_color, shape)
+            elif gem_type == "ruby":
+                self.draw_ruby(frame, rotation, color, glow_color, shape)
+            elif gem_type == "emerald":
+                self.draw_emerald(frame, rotation, color, glow_color, shape)
+            elif gem_type == "sapphire":
+                self.draw_sapphire(frame, rotation, color, glow_color, shape)
             else:  # topaz
-                self.draw_topaz(frame, rotation)
+                self.draw_topaz(frame, rotation, color, glow_color, shape)
                 
-            self.frames.append(frame)
+            frames.append(frame)
+        
+        return frames
     
-    def draw_diamond(self, surface, rotation):
+    def draw_diamond(self, surface, rotation, color, glow_color, shape):
         # Diamond shape (rhombus) with random variations
         width = 30 - abs(rotation - 0.5) * 20  # Simulate rotation by changing width
         height = 30
         
         # Random variation in shape
-        skew = random.uniform(-0.2, 0.2)
-        stretch = random.uniform(0.8, 1.2)
+        skew = shape.uniform(-0.2, 0.2)
+        stretch = shape.uniform(0.8, 1.2)
         height *= stretch
         
         # Draw main shape
@@ -107,16 +93,16 @@ class ImprovedGem(pygame.sprite.Sprite):
         ]
         
         # Draw glow
-        pygame.draw.polygon(surface, self.glow_color, points)
+        pygame.draw.polygon(surface, glow_color, points)
         
         # Draw gem with slightly different points for 3D effect
         inner_points = [
-            (20, 5 + random.uniform(-2, 2)),                # Top
-            (35 - rotation * 10, 20 + random.uniform(-2, 2)),  # Right
-            (20, 35 + random.uniform(-2, 2)),               # Bottom
-            (5 + rotation * 10, 20 + random.uniform(-2, 2)),   # Left
+            (20, 5 + shape.uniform(-2, 2)),                # Top
+            (35 - rotation * 10, 20 + shape.uniform(-2, 2)),  # Right
+            (20, 35 + shape.uniform(-2, 2)),               # Bottom
+            (5 + rotation * 10, 20 + shape.uniform(-2, 2)),   # Left
         ]
-        pygame.draw.polygon(surface, self.color, inner_points)
+        pygame.draw.polygon(surface, color, inner_points)
         
         # Draw facets
         pygame.draw.line(surface, (255, 255, 255, 150), inner_points[0], inner_points[2], 1)
@@ -126,22 +112,22 @@ class ImprovedGem(pygame.sprite.Sprite):
         if rotation < 0.2 or rotation > 0.8:
             self.draw_sparkle(surface)
     
-    def draw_ruby(self, surface, rotation):
+    def draw_ruby(self, surface, rotation, color, glow_color, shape):
         # Ruby shape (circle/oval) with random variations
         width = 30 - abs(rotation - 0.5) * 10
         height = 30
         
         # Random variation
-        stretch = random.uniform(0.8, 1.2)
-        squish = random.uniform(0.8, 1.2)
+        stretch = shape.uniform(0.8, 1.2)
+        squish = shape.uniform(0.8, 1.2)
         width *= stretch
         height *= squish
         
         # Draw glow
-        pygame.draw.ellipse(surface, self.glow_color, (20 - width/2, 20 - height/2, width, height))
+        pygame.draw.ellipse(surface, glow_color, (20 - width/2, 20 - height/2, width, height))
         
         # Draw gem
-        pygame.draw.ellipse(surface, self.color, (20 - width/2 + 2, 20 - height/2 + 2, width - 4, height - 4))
+        pygame.draw.ellipse(surface, color, (20 - width/2 + 2, 20 - height/2 + 2, width - 4, height - 4))
         
         # Draw facets
         angle = rotation * 2 * math.pi
@@ -154,14 +140,14 @@ class ImprovedGem(pygame.sprite.Sprite):
         if rotation < 0.2 or rotation > 0.8:
             self.draw_sparkle(surface)
     
-    def draw_emerald(self, surface, rotation):
+    def draw_emerald(self, surface, rotation, color, glow_color, shape):
         # Emerald shape (rectangle) with random variations
         width = 30 - abs(rotation - 0.5) * 20
         height = 24
         
         # Random variation
-        skew = random.uniform(-0.15, 0.15)
-        stretch = random.uniform(0.9, 1.1)
+        skew = shape.uniform(-0.15, 0.15)
+        stretch = shape.uniform(0.9, 1.1)
         width *= stretch
         
         # Calculate skewed rectangle points
@@ -173,14 +159,14 @@ class ImprovedGem(pygame.sprite.Sprite):
         ]
         
         # Draw glow
-        pygame.draw.polygon(surface, self.glow_color, points)
+        pygame.draw.polygon(surface, glow_color, points)
         
         # Draw gem (slightly smaller)
         inner_points = []
         for x, y in points:
             inner_points.append((x + (20 - x) * 0.1, y + (20 - y) * 0.1))
         
-        pygame.draw.polygon(surface, self.color, inner_points)
+        pygame.draw.polygon(surface, color, inner_points)
         
         # Draw facets - fixed to use correct number of arguments
         mid_top = ((inner_points[0][0] + inner_points[1][0]) / 2, (inner_points[0][1] + inner_points[1][1]) / 2)
@@ -191,36 +177,36 @@ class ImprovedGem(pygame.sprite.Sprite):
         if rotation < 0.2 or rotation > 0.8:
             self.draw_sparkle(surface)
     
-    def draw_sapphire(self, surface, rotation):
+    def draw_sapphire(self, surface, rotation, color, glow_color, shape):
         # Sapphire shape (hexagon) with random variations
         radius = 15 - abs(rotation - 0.5) * 5
         points = []
         
         # Random variation
-        stretch = random.uniform(0.9, 1.1)
+        stretch = shape.uniform(0.9, 1.1)
         radius *= stretch
-        offset_x = random.uniform(-2, 2)
-        offset_y = random.uniform(-2, 2)
+        offset_x = shape.uniform(-2, 2)
+        offset_y = shape.uniform(-2, 2)
         
         for i in range(6):
             angle = 2 * math.pi * i / 6 + rotation * math.pi / 3
-            x = 20 + offset_x + radius * math.cos(angle) * (1 + random.uniform(-0.1, 0.1))
-            y = 20 + offset_y + radius * math.sin(angle) * (1 + random.uniform(-0.1, 0.1))
+            x = 20 + offset_x + radius * math.cos(angle) * (1 + shape.uniform(-0.1, 0.1))
+            y = 20 + offset_y + radius * math.sin(angle) * (1 + shape.uniform(-0.1, 0.1))
             points.append((x, y))
         
         # Draw glow
-        pygame.draw.polygon(surface, self.glow_color, points)
+        pygame.draw.polygon(surface, glow_color, points)
         
         # Draw gem (slightly smaller)
         inner_points = []
         inner_radius = radius - 2
         for i in range(6):
             angle = 2 * math.pi * i / 6 + rotation * math.pi / 3
-            x = 20 + offset_x + inner_radius * math.cos(angle) * (1 + random.uniform(-0.05, 0.05))
-            y = 20 + offset_y + inner_radius * math.sin(angle) * (1 + random.uniform(-0.05, 0.05))
+            x = 20 + offset_x + inner_radius * math.cos(angle) * (1 + shape.uniform(-0.05, 0.05))
+            y = 20 + offset_y + inner_radius * math.sin(angle) * (1 + shape.uniform(-0.05, 0.05))
             inner_points.append((x, y))
         
-        pygame.draw.polygon(surface, self.color, inner_points)
+        pygame.draw.polygon(surface, color, inner_points)
         
         # Draw facets
         pygame.draw.line(surface, (255, 255, 255, 150), inner_points[0], inner_points[3], 1)
@@ -230,15 +216,15 @@ class ImprovedGem(pygame.sprite.Sprite):
         if rotation < 0.2 or rotation > 0.8:
             self.draw_sparkle(surface)
     
-    def draw_topaz(self, surface, rotation):
+    def draw_topaz(self, surface, rotation, color, glow_color, shape):
         # Topaz shape (octagon) with random variations
         radius = 15 - abs(rotation - 0.5) * 5
         points = []
         
         # Random variation
-        stretch_x = random.uniform(0.9, 1.1)
-        stretch_y = random.uniform(0.9, 1.1)
-        offset_angle = random.uniform(-0.1, 0.1)
+        stretch_x = shape.uniform(0.9, 1.1)
+        stretch_y = shape.uniform(0.9, 1.1)
+        offset_angle = shape.uniform(-0.1, 0.1)
         
         for i in range(8):
             angle = 2 * math.pi * i / 8 + rotation * math.pi / 4 + offset_angle
@@ -247,7 +233,7 @@ class ImprovedGem(pygame.sprite.Sprite):
             points.append((x, y))
         
         # Draw glow
-        pygame.draw.polygon(surface, self.glow_color, points)
+        pygame.draw.polygon(surface, glow_color, points)
         
         # Draw gem (slightly smaller)
         inner_points = []
@@ -258,7 +244,7 @@ class ImprovedGem(pygame.sprite.Sprite):
             y = 20 + inner_radius * math.sin(angle) * stretch_y
             inner_points.append((x, y))
         
-        pygame.draw.polygon(surface, self.color, inner_points)
+        pygame.draw.polygon(surface, color, inner_points)
         
         # Draw facets
         pygame.draw.line(surface, (255, 255, 255, 150), inner_points[0], inner_points[4], 1)
@@ -274,6 +260,72 @@ class ImprovedGem(pygame.sprite.Sprite):
         pygame.draw.line(surface, (255, 255, 255), (25, 15), (15, 25), 1)
         pygame.draw.line(surface, (255, 255, 255), (20, 10), (20, 30), 1)
         pygame.draw.line(surface, (255, 255, 255), (10, 20), (30, 20), 1)
+
+GEM_ATLAS = GemAtlas()
+
+# Improved Gem class with better graphics and animations
+class ImprovedGem(pygame.sprite.Sprite):
+    # Gem types and colors, shared by all gems
+    gem_types = GEM_TYPES
+    colors = GEM_COLORS
+    glow_colors = GEM_GLOW_COLORS
+    
+    def __init__(self, gem_type=None, x=None, y=None, atlas=GEM_ATLAS, rng=random):
+        super().__init__()
+        self.atlas = atlas
+        self.rng = rng  # random.Random stream for type, position and phase
+        self.rect = None
+        self.pooled = False  # Set while the gem sits idle in a GemPool
+        self.reset(gem_type, x, y)
+    
+    def reset(self, gem_type=None, x=None, y=None):
+        # Give the gem a new type, position and phase (used by GemPool to
+        # recycle gems without allocating)
+        
+        # Select gem type
+        if gem_type is None:
+            self.gem_type = self.rng.choice(self.gem_types)
+        else:
+            self.gem_type = gem_type
+            
+        self.color = self.colors[self.gem_type]
+        self.glow_color = self.glow_colors[self.gem_type]
+        
+        # Reference a shared set of animation frames
+        self.variant = self.rng.randrange(self.atlas.variants_per_type)
+        self.frames = self.atlas.get_frames(self.gem_type, self.variant)
+        
+        # Animation variables
+        self.frame_index = 0
+        self.animation_speed = 0.1
+        self.animation_timer = 0
+        
+        # Set initial image and position
+        self.image = self.frames[0]
+        if self.rect is None:
+            self.rect = self.image.get_rect()
+        else:
+            self.rect.size = self.image.get_size()
+        
+        # Position the gem
+        if x is None or y is None:
+            self.rect.x = self.rng.randint(50, 750)  # Assuming screen width is 800
+            self.rect.y = self.rng.randint(50, 550)  # Assuming screen height is 600
+        else:
+            self.rect.x = x
+            self.rect.y = y
+            
+        # Store original position for bobbing animation
+        self.original_y = self.rect.y
+        self.bob_offset = self.rng.uniform(0, 2 * math.pi)  # Random start phase
+        self.bob_speed = self.rng.uniform(0.05, 0.1)
+        self.bob_height = self.rng.uniform(3, 6)
+        
+        # Value of the gem
+        self.value = self.get_value()
+        
+        # Handle of the light attached to this gem, if any
+        self.light_handle = None
     
     def get_value(self):
         # Return point value based on gem type
@@ -288,18 +340,204 @@ class ImprovedGem(pygame.sprite.Sprite):
         else:  # topaz
             return 4
     
-    def update(self):
+    def update(self, dt=1/60):
+        steps = dt * 60  # Animation and bob rates are per 1/60 s
+        
         # Update animation frame
-        self.animation_timer += self.animation_speed
+        self.animation_timer += self.animation_speed * steps
         if self.animation_timer >= 1:
             self.animation_timer = 0
             self.frame_index = (self.frame_index + 1) % len(self.frames)
             self.image = self.frames[self.frame_index]
         
         # Bob up and down
-        self.bob_offset += self.bob_speed
+        self.bob_offset += self.bob_speed * steps
         self.rect.y = self.original_y + math.sin(self.bob_offset) * self.bob_height
 
+# Recycles gem sprites across levels and restarts instead of rebuilding them
+class GemPool:
+    def __init__(self, atlas=GEM_ATLAS, rng=random):
+        self.atlas = atlas
+        self.rng = rng  # Shared by every gem the pool creates
+        self.free = []
+        self.created = 0
+    
+    def acquire(self, gem_type=None, x=None, y=None):
+        """Get a gem, reusing a released one if available"""
+        if self.free:
+            gem = self.free.pop()
+            gem.pooled = False
+            gem.reset(gem_type, x, y)
+        else:
+            gem = ImprovedGem(gem_type, x, y, self.atlas, self.rng)
+            self.created += 1
+        return gem
+    
+    def release(self, gem):
+        """Remove a gem from all groups and keep it for reuse"""
+        gem.kill()
+        if not gem.pooled:
+            gem.pooled = True
+            self.free.append(gem)
+    
+    def release_all(self, gems):
+        """Release every gem in an iterable (e.g. a sprite group)"""
+        for gem in list(gems):
+            self.release(gem)
+    
+    def prewarm(self, count):
+        """Create gems up front so later levels don't allocate"""
+        while len(self.free) < count:
+            gem = ImprovedGem(atlas=self.atlas, rng=self.rng)
+            gem.pooled = True
+            self.free.append(gem)
+            self.created += 1
+
+# Sprite group that keeps gem animation state in NumPy columns so every gem
+# can be bobbed and animated in one vectorized step
+class GemField(pygame.sprite.Group):
+    COLUMNS = ('original_y', 'y', 'prev_y', 'bob_offset', 'bob_speed', 'bob_height',
+               'animation_timer', 'animation_speed', 'frame_index', 'num_frames')
+    
+    def __init__(self, *sprites, capacity=64, spatial_hash=None):
+        # Optional SpatialHash kept in sync as gems are added, removed and bob
+        self.spatial_hash = spatial_hash
+        
+        # Columns must exist before Group.__init__ adds the initial sprites
+        self.count = 0
+        self.capacity = 0
+        self.slots = {}
+        self.gems_by_slot = []
+        self.original_y = np.zeros(0)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.prev_y = np.zeros(0, dtype=np.int64)  # y before the last update, for interpolation
+        self.bob_offset = np.zeros(0)
+        self.bob_speed = np.zeros(0)
+        self.bob_height = np.zeros(0)
+        self.animation_timer = np.zeros(0)
+        self.animation_speed = np.zeros(0)
+        self.frame_index = np.zeros(0, dtype=np.int64)
+        self.num_frames = np.zeros(0, dtype=np.int64)
+        self.reserve(capacity)
+        
+        super().__init__(*sprites)
+    
+    def reserve(self, capacity):
+        """Grow the columns so they can hold at least `capacity` gems"""
+        if capacity <= self.capacity:
+            return
+        new_capacity = max(capacity, self.capacity * 2)
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = new_capacity
+    
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite)
+        if sprite in self.slots:
+            return
+        
+        # Copy the gem's animation state into a new slot
+        self.reserve(self.count + 1)
+        slot = self.count
+        self.original_y[slot] = sprite.original_y
+        self.y[slot] = sprite.rect.y
+        self.prev_y[slot] = sprite.rect.y
+        self.bob_offset[slot] = sprite.bob_offset
+        self.bob_speed[slot] = sprite.bob_speed
+        self.bob_height[slot] = sprite.bob_height
+        self.animation_timer[slot] = sprite.animation_timer
+        self.animation_speed[slot] = sprite.animation_speed
+        self.frame_index[slot] = sprite.frame_index
+        self.num_frames[slot] = len(sprite.frames)
+        self.slots[sprite] = slot
+        self.gems_by_slot.append(sprite)
+        self.count += 1
+        
+        if self.spatial_hash is not None:
+            self.spatial_hash.insert(sprite)
+    
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        slot = self.slots.pop(sprite)
+        if self.spatial_hash is not None:
+            self.spatial_hash.remove(sprite)
+        
+        # Hand the animation state back to the gem
+        sprite.bob_offset = float(self.bob_offset[slot])
+        sprite.animation_timer = float(self.animation_timer[slot])
+        sprite.frame_index = int(self.frame_index[slot])
+        
+        # Move the last gem into the freed slot
+        last = self.count - 1
+        if slot != last:
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[slot] = column[last]
+            moved = self.gems_by_slot[last]
+            self.gems_by_slot[slot] = moved
+            self.slots[moved] = slot
+        self.gems_by_slot.pop()
+        self.count -= 1
+    
+    def update(self, dt=1/60):
+        """Advance animation frames and bobbing for every gem at once"""
+        n = self.count
+        if n == 0:
+            return
+        steps = dt * 60  # Animation and bob rates are per 1/60 s
+        self.prev_y[:n] = self.y[:n]
+        
+        # Update animation frames
+        timer = self.animation_timer[:n]
+        timer += self.animation_speed[:n] * steps
+        advanced = np.flatnonzero(timer >= 1)
+        if len(advanced):
+            timer[advanced] = 0
+            frame_index = self.frame_index[:n]
+            frame_index[advanced] = (frame_index[advanced] + 1) % self.num_frames[advanced]
+            for slot, index in zip(advanced.tolist(), frame_index[advanced].tolist()):
+                gem = self.gems_by_slot[slot]
+                gem.frame_index = index
+                gem.image = gem.frames[index]
+        
+        # Bob up and down, rounding half away from zero like Rect does
+        bob_offset = self.bob_offset[:n]
+        bob_offset += self.bob_speed[:n] * steps
+        y = self.original_y[:n] + np.sin(bob_offset) * self.bob_height[:n]
+        y = np.trunc(y + np.copysign(0.5, y)).astype(np.int64)
+        
+        # Only write back the rects that actually moved
+        moved = np.flatnonzero(y != self.y[:n])
+        if len(moved):
+            self.y[:n] = y
+            for slot, new_y in zip(moved.tolist(), y[moved].tolist()):
+                gem = self.gems_by_slot[slot]
+                gem.rect.y = new_y
+                if self.spatial_hash is not None:
+                    self.spatial_hash.update(gem)
+    
+    def get_interpolated_y(self, alpha):
+        """Get each gem's y between its previous and current position, in gems_by_slot order"""
+        n = self.count
+        prev_y = self.prev_y[:n]
+        y = prev_y + (self.y[:n] - prev_y) * alpha
+        return np.trunc(y + np.copysign(0.5, y)).astype(np.int64).tolist()
+    
+    def draw_interpolated(self, surface, alpha):
+        """
+        Draw every gem between its previous and current position
+        
+        alpha is how far the frame is from the last update to the next (0 to
+        1), so bobbing stays smooth when frames and updates don't line up.
+        """
+        if self.count == 0:
+            return
+        surface.blits([(gem.image, (gem.rect.x, draw_y))
+                       for gem, draw_y in zip(self.gems_by_slot, self.get_interpolated_y(alpha))], doreturn=False)
+
 # Test the gem animations
 if __name__ == "__main__":
     pygame.init()
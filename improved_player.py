@@ -3,6 +3,9 @@ import math
 
 # Player class with improved graphics and animations
 class ImprovedPlayer(pygame.sprite.Sprite):
+    # Animation frames, drawn by the first player and shared by the rest
+    shared_frames = None
+    
     def __init__(self):
         super().__init__()
         
@@ -13,16 +16,20 @@ class ImprovedPlayer(pygame.sprite.Sprite):
         self.BLACK = (0, 0, 0)
         
         # Animation frames
-        self.frames = {
-            'idle': [],
-            'walk_right': [],
-            'walk_left': [],
-            'walk_up': [],
-            'walk_down': []
-        }
-        
-        # Create animation frames
-        self.create_animation_frames()
+        if ImprovedPlayer.shared_frames is None:
+            self.frames = {
+                'idle': [],
+                'walk_right': [],
+                'walk_left': [],
+                'walk_up': [],
+                'walk_down': []
+            }
+            
+            # Create animation frames
+            self.create_animation_frames()
+            ImprovedPlayer.shared_frames = self.frames
+        else:
+            self.frames = ImprovedPlayer.shared_frames
         
         # Animation state
         self.state = 'idle'
@@ -36,11 +43,20 @@ class ImprovedPlayer(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.center = (400, 300)  # Center of screen
         
-        # Movement
+        # Movement (speed is in pixels per 1/60 s). The position is kept as
+        # floats and the previous tick's position is kept for interpolation
         self.speed = 5
+        self.pos = pygame.math.Vector2(self.rect.center)
+        self.prev_pos = pygame.math.Vector2(self.pos)
         self.moving = False
         self.direction = pygame.math.Vector2(0, 0)
         
+    @classmethod
+    def preload_frames(cls):
+        """Draw the shared animation frames ahead of the first player"""
+        if ImprovedPlayer.shared_frames is None:
+            cls()
+    
     def create_animation_frames(self):
         # Create idle frames
         for i in range(2):
@@ -143,34 +159,71 @@ class ImprovedPlayer(pygame.sprite.Sprite):
             
             self.frames['walk_down'].append(frame)
     
-    def update(self):
-        # Get keyboard input
+    def get_input_direction(self):
+        """Read the arrow keys / WASD into a direction vector"""
         keys = pygame.key.get_pressed()
+        direction = pygame.math.Vector2(0, 0)
         
-        # Reset direction
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            direction.x = -1
+        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            direction.x = 1
+        
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            direction.y = -1
+        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            direction.y = 1
+        
+        return direction
+    
+    def reset(self, center=(400, 300)):
+        """Put the player back at its starting position, standing still"""
+        self.rect.center = center
+        self.pos.update(center)
+        self.prev_pos.update(center)
         self.direction.x = 0
         self.direction.y = 0
         self.moving = False
+        self.state = 'idle'
+        self.frame_index = 0
+        self.animation_timer = 0
+        self.facing_right = True
+        self.image = self.frames['idle'][0]
+    
+    def update(self, direction=None, dt=1/60):
+        """
+        Move and animate the player
+        
+        Args:
+            direction: (x, y) input vector. If None, the keyboard is read.
+            dt: Time step in seconds
+        """
+        steps = dt * 60  # Movement and animation rates are per 1/60 s
+        self.prev_pos.update(self.pos)
+        
+        if direction is None:
+            direction = self.get_input_direction()
+        
+        # Reset direction
+        self.direction.x = direction[0]
+        self.direction.y = direction[1]
+        self.moving = False
         
-        # Move the player
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.direction.x = -1
+        # Pick the animation from the input
+        if self.direction.x < 0:
             self.state = 'walk_left'
             self.facing_right = False
             self.moving = True
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.direction.x = 1
+        elif self.direction.x > 0:
             self.state = 'walk_right'
             self.facing_right = True
             self.moving = True
         
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.direction.y = -1
+        if self.direction.y < 0:
             if not self.moving:  # Only change state if not already moving horizontally
                 self.state = 'walk_up'
             self.moving = True
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.direction.y = 1
+        elif self.direction.y > 0:
             if not self.moving:  # Only change state if not already moving horizontally
                 self.state = 'walk_down'
             self.moving = True
@@ -184,21 +237,17 @@ class ImprovedPlayer(pygame.sprite.Sprite):
             self.direction = self.direction.normalize()
         
         # Move the player
-        self.rect.x += self.direction.x * self.speed
-        self.rect.y += self.direction.y * self.speed
-        
-        # Keep player on screen
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > 800:  # Assuming screen width is 800
-            self.rect.right = 800
-        if self.rect.top < 0:
-            self.rect.top = 0
-        if self.rect.bottom > 600:  # Assuming screen height is 600
-            self.rect.bottom = 600
+        self.pos += self.direction * self.speed * steps
+        
+        # Keep player on screen (assuming an 800x600 screen)
+        half_width = self.rect.width / 2
+        half_height = self.rect.height / 2
+        self.pos.x = max(half_width, min(800 - half_width, self.pos.x))
+        self.pos.y = max(half_height, min(600 - half_height, self.pos.y))
+        self.rect.center = (round(self.pos.x), round(self.pos.y))
         
         # Update animation
-        self.animation_timer += self.animation_speed
+        self.animation_timer += self.animation_speed * steps
         if self.animation_timer >= 1:
             self.animation_timer = 0
             # Make sure we have frames for this state
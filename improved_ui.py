@@ -45,6 +45,11 @@ class ImprovedUI:
         for button in self.buttons:
             if button.get('hover_animation', False):
                 button['hover_scale'] = 1.0 + 0.05 * math.sin(self.animation_timer * 5)
+        
+        # Count down the score pulse
+        score_animation = self.animations.get('score')
+        if score_animation is not None and score_animation['timer'] > 0:
+            score_animation['timer'] = max(0.0, score_animation['timer'] - dt)
     
     def draw_text(self, surface, text, font, color, x, y, align="center", shadow=True, shadow_color=(0, 0, 0), shadow_offset=2):
         """Draw text with optional shadow and alignment"""
@@ -284,8 +289,7 @@ class ImprovedUI:
                     'end_scale': 1.0     # Ending scale
                 }
             elif self.animations['score']['timer'] > 0:
-                # Animation in progress
-                self.animations['score']['timer'] -= 1/60  # Assuming 60 FPS
+                # Animation in progress (update() counts the timer down)
                 
                 # Calculate current scale
                 progress = 1.0 - (self.animations['score']['timer'] / 1.0)  # 0 to 1
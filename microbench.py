@@ -0,0 +1,220 @@
+# Microbenchmarks for GemRush's expensive primitives. Each benchmark times one
+# function in isolation and the results are printed as JSON (microseconds per
+# call) with stable keys, so a change can be checked against the exact
+# function it targets
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout pure JSON
+
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+import pygame
+
+from improved_gems import GemAtlas, ImprovedGem, GEM_COLORS
+from improved_player import ImprovedPlayer
+from improved_effects import ParticleSystem, LightEffect, PARTICLE_CIRCLE, PARTICLE_STAR, PRIORITY_BURST
+from improved_background import ParallaxBackground
+from improved_ui import ImprovedUI
+from leaderboard import Leaderboard
+
+WIDTH, HEIGHT = 800, 600
+
+# Registered benchmarks: name -> function that does its setup and returns
+# the callable to time
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+@benchmark("gem.init")
+def bench_gem_init():
+    # Frames come from the shared atlas, so this is the per-gem cost
+    atlas = GemAtlas()
+    atlas.preload()
+    return lambda: ImprovedGem(atlas=atlas)
+
+@benchmark("gem.atlas_bake")
+def bench_gem_atlas_bake():
+    # Baking every frame of every gem type and variant from scratch
+    return lambda: GemAtlas().preload()
+
+@benchmark("player.create_animation_frames")
+def bench_player_frames():
+    player = ImprovedPlayer()
+    def run():
+        for frames in player.frames.values():
+            frames.clear()
+        player.create_animation_frames()
+    return run
+
+# Colors particles are spawned with in the game: gem bursts and the
+# player's blue trail (sparkle stars are always drawn white)
+PARTICLE_COLORS = list(GEM_COLORS.values()) + [(50, 100, 255)]
+
+def fill_particles(count, colors=PARTICLE_COLORS):
+    # With colors=None every particle gets a random color instead
+    system = ParticleSystem(max(count, 1000))
+    rng = np.random.default_rng(0)
+    if colors is None:
+        color = rng.integers(100, 256, (count, 3))
+    else:
+        color = np.array(colors)[rng.integers(len(colors), size=count)]
+    slots = system.particles.allocate(count, PRIORITY_BURST)
+    system.particles.spawn(
+        slots,
+        rng.uniform((0, 0), (WIDTH, HEIGHT), (count, 2)),
+        rng.uniform(-0.01, 0.01, (count, 2)),  # Barely moving, so they stay on screen
+        rng.uniform(2, 6, count),
+        color,
+        255,
+        1e9,  # Never dies or fades
+        rng.choice((PARTICLE_CIRCLE, PARTICLE_STAR), count),
+        PRIORITY_BURST
+    )
+    return system
+
+for count in (1000, 10000):
+    def bench_particle_update(count=count):
+        system = fill_particles(count)
+        return system.update
+    
+    def bench_particle_draw(count=count):
+        system = fill_particles(count)
+        surface = pygame.Surface((WIDTH, HEIGHT))
+        system.draw(surface)  # Warm the sprite cache
+        return lambda: system.draw(surface)
+    
+    benchmark(f"particles.update[{count}]")(bench_particle_update)
+    benchmark(f"particles.draw[{count}]")(bench_particle_draw)
+
+@benchmark("particles.draw_cache_thrash[10000]")
+def bench_particle_draw_cache_thrash():
+    # Thousands of distinct colors overflow the sprite cache, so every call
+    # renders most sprites from scratch
+    system = fill_particles(10000, colors=None)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    system.draw(surface)
+    return lambda: system.draw(surface)
+
+for count in (10, 100):
+    def bench_light_render(count=count):
+        lights = LightEffect(WIDTH, HEIGHT)
+        rng = random.Random(0)
+        for _ in range(count):
+            lights.add_light(rng.randint(0, WIDTH), rng.randint(0, HEIGHT), rng.choice((50, 80, 120)),
+                             (rng.randint(100, 255), rng.randint(100, 255), rng.randint(100, 255)), 0.3)
+        lights.render()  # Warm the texture cache
+        return lights.render
+    
+    benchmark(f"lights.render[{count}]")(bench_light_render)
+
+@benchmark("background.create_sky_layer")
+def bench_create_sky_layer():
+    background = ParallaxBackground(WIDTH, HEIGHT)
+    layer = background.layers[0]["surface"]
+    return lambda: background.create_sky_layer(layer)
+
+@benchmark("ui.draw_text")
+def bench_draw_text():
+    ui = ImprovedUI(WIDTH, HEIGHT)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    return lambda: ui.draw_text(surface, "Score: 12345", ui.medium_font, (255, 255, 255), 400, 300)
+
+for count in (10, 10000):
+    def bench_leaderboard_add_entry(count=count):
+        # Runs inside the scratch directory, so leaderboard.json is a temp file
+        leaderboard = Leaderboard(max_entries=count)
+        leaderboard.entries = [{"score": 1000 - i % 1000, "time_taken": 60.0 + i % 60, "level_reached": 3,
+                                "date": "2024-01-01 12:00"} for i in range(count)]
+        return lambda: leaderboard.add_entry(500, 42.0, 3)
+    
+    benchmark(f"leaderboard.add_entry[{count}]")(bench_leaderboard_add_entry)
+
+def run_benchmark(setup, repeat=5, min_time=0.2):
+    """Time a benchmark and get per-call statistics in microseconds"""
+    func = setup()
+    timer = timeit.Timer(func)
+    
+    # Pick a loop count that takes at least min_time per repeat
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time or loops >= 1000000:
+            break
+        loops *= 2 if loops < 8 else 4
+    
+    per_call = [timer.timeit(loops) / loops * 1e6 for _ in range(repeat)]
+    return {
+        'unit': 'us',
+        'min': min(per_call),
+        'median': statistics.median(per_call),
+        'mean': statistics.fmean(per_call),
+        'stdev': statistics.stdev(per_call) if repeat > 1 else 0.0,
+        'loops': loops,
+        'repeat': repeat
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run GemRush microbenchmarks")
+    parser.add_argument("patterns", nargs="*", help="Only run benchmarks matching these globs (e.g. 'particles.*')")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repeats per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    parser.add_argument("--output", help="Write the results JSON here instead of stdout")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+    
+    names = sorted(BENCHMARKS)
+    if args.patterns:
+        names = [name for name in names if any(fnmatch.fnmatch(name, pattern) for pattern in args.patterns)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    output_path = os.path.abspath(args.output) if args.output else None
+    
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    
+    results = {}
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name in names:
+                print(f"Running {name}...", file=sys.stderr)
+                random.seed(0)
+                results[name] = run_benchmark(BENCHMARKS[name], args.repeat, args.min_time)
+        finally:
+            os.chdir(start_dir)
+    pygame.quit()
+    
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'platform': platform.platform()
+        },
+        'benchmarks': results
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
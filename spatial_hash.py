@@ -0,0 +1,122 @@
+import pygame
+
+# Uniform grid spatial hash for broad-phase collision and proximity queries
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        """
+        Initialize an empty spatial hash
+        
+        Args:
+            cell_size: Width and height of a grid cell in pixels. Works best at
+                roughly the size of the objects stored in it.
+        """
+        self.cell_size = cell_size
+        # Buckets are dicts used as insertion-ordered sets, so queries return
+        # objects in the same order in every process
+        self.cells = {}    # (cell_x, cell_y) -> {object: None}
+        self.entries = {}  # object -> (rect, cell range)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __contains__(self, obj):
+        return obj in self.entries
+    
+    def get_cell_range(self, rect):
+        """Get the (left, top, right, bottom) cell indices a rect overlaps"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+    
+    def insert(self, obj, rect=None):
+        """Add an object, using obj.rect if no rect is given"""
+        if obj in self.entries:
+            self.update(obj, rect)
+            return
+        
+        rect = obj.rect if rect is None else rect
+        cell_range = self.get_cell_range(rect)
+        self.entries[obj] = (rect, cell_range)
+        for cell in self.iter_cells(cell_range):
+            self.cells.setdefault(cell, {})[obj] = None
+    
+    def update(self, obj, rect=None):
+        """Re-file an object after it moved"""
+        old_rect, old_range = self.entries[obj]
+        rect = old_rect if rect is None else rect
+        cell_range = self.get_cell_range(rect)
+        
+        # Most moves stay within the same cells
+        if cell_range != old_range:
+            self.unlink(obj, old_range)
+            for cell in self.iter_cells(cell_range):
+                self.cells.setdefault(cell, {})[obj] = None
+        self.entries[obj] = (rect, cell_range)
+    
+    def remove(self, obj):
+        """Remove an object if it is stored"""
+        entry = self.entries.pop(obj, None)
+        if entry is not None:
+            self.unlink(obj, entry[1])
+    
+    def clear(self):
+        """Remove all objects"""
+        self.cells.clear()
+        self.entries.clear()
+    
+    def unlink(self, obj, cell_range):
+        # Remove an object from its cells, dropping cells that become empty
+        for cell in self.iter_cells(cell_range):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.pop(obj, None)
+                if not bucket:
+                    del self.cells[cell]
+    
+    def iter_cells(self, cell_range):
+        left, top, right, bottom = cell_range
+        for cell_x in range(left, right + 1):
+            for cell_y in range(top, bottom + 1):
+                yield (cell_x, cell_y)
+    
+    def candidates(self, cell_range):
+        """Get every object filed in the given cells (broad phase only)"""
+        found = {}
+        for cell in self.iter_cells(cell_range):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+    
+    def query_point(self, x, y):
+        """Get objects whose rect contains a point"""
+        size = self.cell_size
+        bucket = self.cells.get((int(x) // size, int(y) // size), ())
+        return [obj for obj in bucket if self.entries[obj][0].collidepoint(x, y)]
+    
+    def query_rect(self, rect):
+        """Get objects whose rect overlaps a rect"""
+        rect = pygame.Rect(rect)
+        return [obj for obj in self.candidates(self.get_cell_range(rect))
+                if self.entries[obj][0].colliderect(rect)]
+    
+    def query_radius(self, x, y, radius):
+        """Get objects whose rect overlaps a circle"""
+        bounds = pygame.Rect(int(x - radius), int(y - radius), int(radius * 2) + 1, int(radius * 2) + 1)
+        found = []
+        for obj in self.candidates(self.get_cell_range(bounds)):
+            rect = self.entries[obj][0]
+            # Distance from the centre to the closest pixel of the rect
+            dx = max(rect.left - x, 0, x - (rect.right - 1))
+            dy = max(rect.top - y, 0, y - (rect.bottom - 1))
+            if dx * dx + dy * dy <= radius * radius:
+                found.append(obj)
+        return found
+    
+    def spritecollide(self, sprite, dokill=False):
+        """Drop-in for pygame.sprite.spritecollide against the sprites in this hash"""
+        collided = self.query_rect(sprite.rect)
+        if dokill:
+            for obj in collided:
+                obj.kill()
+        return collided